@@ -0,0 +1,117 @@
+"""
+Clustering-based gap detection for the Research Gap Finder.
+
+Normalized abstract embeddings are grouped with mini-batch k-means, which
+stays fast on CPU for tens of thousands of papers. All intra- and
+inter-cluster distances are computed with vectorized NumPy operations.
+Papers are then scored on four signals:
+
+- edge: how far a paper sits from its own cluster's centroid, relative to
+  the cluster's typical spread
+- small: how small the paper's cluster is
+- sparse: how loosely packed the paper's cluster is (low cohesion)
+- isolated: how far the paper's cluster is from its nearest neighbouring
+  cluster
+
+Each signal is turned into a percentile rank, and the mean of the four ranks
+is the gap score. Equal values share their average rank, so cluster-level
+signals do not depend on the order papers were fetched in.
+"""
+
+import numpy as np
+from scipy.stats import rankdata
+from sklearn.cluster import MiniBatchKMeans
+
+MAX_CLUSTERS = 50
+MIN_CLUSTERS = 2
+KMEANS_BATCH_SIZE = 1024
+# Share of papers (highest gap score) reported as gaps
+GAP_FRACTION = 0.1
+MIN_GAPS = 5
+
+GAP_REASONS = {
+    'edge': "Cluster edge",
+    'small': "Small cluster",
+    'sparse': "Sparse region",
+    'isolated': "Isolated cluster"
+}
+
+
+def choose_num_clusters(n_papers):
+    """Rule-of-thumb cluster count, sqrt(n / 2), clipped to a sensible range."""
+    return int(np.clip(round(np.sqrt(n_papers / 2)), MIN_CLUSTERS, MAX_CLUSTERS))
+
+
+def _percentile_rank(values):
+    """Rank of each value scaled to [0, 1]; tied values get their average rank."""
+    if len(values) < 2:
+        return np.zeros(len(values))
+    return (rankdata(values, method='average') - 1) / (len(values) - 1)
+
+
+def _strongest_signal(stacked):
+    """Row index of each column's largest signal, treating near-equal values as ties.
+
+    Ties go to the earliest signal in GAP_REASONS order, so rounding noise
+    never decides the reason.
+    """
+    return np.argmax(np.isclose(stacked, stacked.max(axis=0)), axis=0)
+
+
+def cluster_gaps(embeddings, n_clusters=None, random_state=0, gap_fraction=GAP_FRACTION, min_gaps=MIN_GAPS):
+    """Cluster embeddings and score every paper as a potential gap.
+
+    Returns a dict with the gap indices (best first) and per-paper arrays:
+    'labels', 'gap_scores', 'reasons' (keys of GAP_REASONS) and the signal
+    percentiles in 'signals', plus 'centroids' and 'cluster_sizes'.
+    """
+    X = np.asarray(embeddings, dtype=np.float32)
+    X = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+    n = len(X)
+
+    if n_clusters is None:
+        n_clusters = choose_num_clusters(n)
+    n_clusters = max(1, min(n_clusters, n))
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=KMEANS_BATCH_SIZE,
+                             n_init=3, random_state=random_state)
+    labels = kmeans.fit_predict(X)
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+    # Intra-cluster: cosine similarity of every paper to its own centroid
+    own_similarity = np.einsum('ij,ij->i', X, centroids[labels])
+    sizes = np.bincount(labels, minlength=n_clusters).astype(np.float64)
+    safe_sizes = np.maximum(sizes, 1)
+    cohesion = np.bincount(labels, weights=own_similarity, minlength=n_clusters) / safe_sizes
+    variance = np.bincount(labels, weights=own_similarity ** 2, minlength=n_clusters) / safe_sizes - cohesion ** 2
+    spread = np.sqrt(np.maximum(variance, 0))
+
+    # Inter-cluster: similarity of each centroid to its nearest other centroid
+    centroid_similarity = centroids @ centroids.T
+    np.fill_diagonal(centroid_similarity, -np.inf)
+    nearest_cluster = centroid_similarity.max(axis=1) if n_clusters > 1 else np.ones(n_clusters)
+
+    raw_signals = {
+        'edge': (cohesion[labels] - own_similarity) / np.maximum(spread[labels], 1e-6),
+        'small': -sizes[labels],
+        'sparse': -cohesion[labels],
+        'isolated': -nearest_cluster[labels]
+    }
+    signals = {name: _percentile_rank(values) for name, values in raw_signals.items()}
+    stacked = np.vstack([signals[name] for name in GAP_REASONS])
+    gap_scores = stacked.mean(axis=0)
+    reasons = np.array(list(GAP_REASONS))[_strongest_signal(stacked)]
+
+    num_gaps = min(n, max(min_gaps, int(np.ceil(gap_fraction * n))))
+    gap_indices = np.argsort(-gap_scores, kind='stable')[:num_gaps]
+
+    return {
+        'gap_indices': gap_indices,
+        'labels': labels,
+        'gap_scores': gap_scores,
+        'reasons': reasons,
+        'signals': signals,
+        'centroids': centroids,
+        'cluster_sizes': sizes.astype(int)
+    }
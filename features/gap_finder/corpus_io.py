@@ -0,0 +1,105 @@
+"""
+Columnar export and re-import of gap-analysis corpora.
+
+A corpus is written as Parquet through Arrow, one row group at a time. It
+holds the paper metadata, similarity scores and gap flags, plus the abstract
+embeddings as a fixed-size list column. Importing the file restores the
+analysis, embeddings included, without fetching papers or running the
+embedding model again.
+"""
+
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SCHEMA_VERSION = 1
+ROW_GROUP_SIZE = 1024
+
+# Optional per-paper fields written when present (set by the clustering engine)
+OPTIONAL_FIELDS = {
+    'cluster': pa.int32(),
+    'gap_score': pa.float32(),
+    'gap_reason': pa.string()
+}
+
+
+def corpus_to_table(papers, embeddings, gap_indices, metadata=None):
+    """Build an Arrow table of papers, scores, gap flags and embeddings.
+
+    gap_indices lists the positions of the gap papers, best first; their rank
+    is stored so the original order can be restored.
+    """
+    n = len(papers)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(n, -1)
+
+    # Gap flags and ranks from the index list, no per-row membership tests
+    gap_indices = np.asarray(gap_indices, dtype=np.int64)
+    is_gap = np.zeros(n, dtype=bool)
+    is_gap[gap_indices] = True
+    gap_rank = np.full(n, -1, dtype=np.int32)
+    gap_rank[gap_indices] = np.arange(len(gap_indices), dtype=np.int32)
+
+    columns = {
+        'title': pa.array([p.get('title', '') for p in papers], pa.string()),
+        'source': pa.array([p.get('source', '') for p in papers], pa.string()),
+        'year': pa.array([str(p.get('year', '')) for p in papers], pa.string()),
+        'authors': pa.array([p.get('authors', '') for p in papers], pa.string()),
+        'abstract': pa.array([p.get('abstract', '') for p in papers], pa.string()),
+        'similarity': pa.array(np.array([p.get('similarity', np.nan) for p in papers], dtype=np.float32)),
+        'is_gap': pa.array(is_gap),
+        'gap_rank': pa.array(gap_rank, mask=gap_rank < 0),
+    }
+    for field, arrow_type in OPTIONAL_FIELDS.items():
+        if papers and all(field in p for p in papers):
+            columns[field] = pa.array([p[field] for p in papers], arrow_type)
+    columns['embedding'] = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), embeddings.shape[1])
+
+    table = pa.table(columns)
+    file_metadata = {
+        'schema_version': SCHEMA_VERSION,
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        **(metadata or {})
+    }
+    return table.replace_schema_metadata({'gap_finder': json.dumps(file_metadata)})
+
+
+def write_parquet(table, sink=None, row_group_size=ROW_GROUP_SIZE):
+    """Stream table to sink (a path or file object) one row group at a time.
+
+    Without a sink the Parquet file is returned as bytes.
+    """
+    target = sink if sink is not None else io.BytesIO()
+    with pq.ParquetWriter(target, table.schema, compression='zstd') as writer:
+        for batch in table.to_batches(max_chunksize=row_group_size):
+            writer.write_batch(batch)
+    if sink is None:
+        return target.getvalue()
+    return None
+
+
+def export_corpus(papers, embeddings, gap_indices, metadata=None):
+    """Parquet bytes of a gap-analysis corpus, ready for a download button."""
+    return write_parquet(corpus_to_table(papers, embeddings, gap_indices, metadata))
+
+
+def read_corpus(source):
+    """Load an exported corpus; returns (papers, embeddings, gap_indices, metadata)."""
+    table = pq.read_table(source)
+    metadata = json.loads((table.schema.metadata or {}).get(b'gap_finder', b'{}'))
+
+    embedding_column = table.column('embedding').combine_chunks()
+    dim = embedding_column.type.list_size
+    embeddings = embedding_column.flatten().to_numpy().reshape(-1, dim)
+
+    paper_fields = ['title', 'source', 'year', 'authors', 'abstract', 'similarity']
+    paper_fields += [field for field in OPTIONAL_FIELDS if field in table.column_names]
+    papers = table.select(paper_fields).to_pylist()
+
+    gap_rank = table.column('gap_rank').to_numpy(zero_copy_only=False)
+    ranked = np.flatnonzero(~np.isnan(gap_rank))
+    gap_indices = ranked[np.argsort(gap_rank[ranked])]
+    return papers, embeddings, gap_indices.tolist(), metadata
@@ -5,11 +5,24 @@ import numpy as np
 import re
 import pandas as pd
 import plotly.express as px
-from collections import Counter
+from collections import Counter, OrderedDict
 import time
 from datetime import datetime
 import json
+import os
+import queue
+import threading
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from keybert import KeyBERT
+from keybert.backend import BaseEmbedder
+from sklearn.feature_extraction.text import CountVectorizer
+from features.gap_finder.keyword_engine import KeywordEngine
+from features.gap_finder.cluster_engine import cluster_gaps, GAP_REASONS
+from features.gap_finder.projection import ProjectionBasis
+from features.gap_finder.corpus_io import export_corpus, read_corpus
+from features.gap_finder.topic_watch import TopicWatcher, DEFAULT_INTERVAL_HOURS, paper_key
+from utils.llm_cache import LLM_CACHE, make_key
 import torch
 from transformers import AutoTokenizer, AutoModel
 
@@ -56,161 +69,388 @@ def load_scibert_model():
     # If all models fail, raise an error
     raise Exception("Failed to load any embedding model. Please check your internet connection.")
 
+# Abstracts embedded per forward pass; texts are grouped by length to limit padding
+EMBEDDING_BATCH_SIZE = 16
+# Keyphrases are only a few tokens long, so many more fit in one forward pass
+CANDIDATE_EMBEDDING_BATCH_SIZE = 128
+
 # Function to get SciBERT embeddings
-def get_scibert_embeddings(texts, tokenizer, model):
-    embeddings = []
-    with torch.no_grad():
-        for text in texts:
-            # Tokenize and get model output
-            inputs = tokenizer(text, padding=True, truncation=True, return_tensors="pt", max_length=512)
-            outputs = model(**inputs)
-            
-            # Mean Pooling - Take average of all token embeddings
-            token_embeddings = outputs.last_hidden_state
-            attention_mask = inputs['attention_mask']
-            input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-            sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-            sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-            embedding = (sum_embeddings / sum_mask).squeeze().numpy()
-            
-            embeddings.append(embedding)
+def get_scibert_embeddings(texts, tokenizer, model, batch_size=EMBEDDING_BATCH_SIZE, num_threads=None):
+    """Embed texts in length-bucketed batches with masked mean pooling.
+    
+    Returns a float32 array of L2-normalized embeddings (one row per text, in
+    input order), so cosine similarity is a plain dot product. num_threads
+    optionally caps torch's intra-op threads for the duration of the call.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, model.config.hidden_size), dtype=np.float32)
+    
+    # Sorting by length keeps similarly sized texts together, so each batch pads very little
+    order = np.argsort([len(text) for text in texts], kind='stable')
+    embeddings = np.zeros((len(texts), model.config.hidden_size), dtype=np.float32)
+    
+    previous_threads = torch.get_num_threads()
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    try:
+        with torch.inference_mode():
+            for start in range(0, len(texts), batch_size):
+                batch_idx = order[start:start + batch_size]
+                inputs = tokenizer([texts[i] for i in batch_idx], padding=True, truncation=True,
+                                   return_tensors="pt", max_length=512)
+                outputs = model(**inputs)
+                
+                # Mean Pooling - Take average of all non-padding token embeddings
+                token_embeddings = outputs.last_hidden_state
+                input_mask_expanded = inputs['attention_mask'].unsqueeze(-1).to(token_embeddings.dtype)
+                sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
+                sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+                pooled = torch.nn.functional.normalize(sum_embeddings / sum_mask, p=2, dim=1)
+                
+                embeddings[batch_idx] = pooled.float().cpu().numpy()
+    finally:
+        if num_threads:
+            torch.set_num_threads(previous_threads)
     
-    return np.array(embeddings)
+    return embeddings
 
-def fetch_papers(query, limit=75):
-    """Fetch papers from Semantic Scholar, arXiv, and CrossRef with improved error handling and year filtering."""
-    papers = []
-    limit_per_source = limit // 3
-    current_year = datetime.now().year
+# Abstract embeddings kept in memory across stages and reruns
+MAX_CACHED_EMBEDDINGS = 20000
+_EMBEDDING_CACHE = OrderedDict()
+_EMBEDDING_CACHE_LOCK = threading.Lock()
+
+def _embedding_cache_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\x00{text}".encode('utf-8')).hexdigest()
+
+def get_cached_embeddings(texts, tokenizer, model):
+    """get_scibert_embeddings with an in-memory LRU, so only unseen texts are embedded."""
+    model_name = getattr(model.config, '_name_or_path', '')
+    keys = [_embedding_cache_key(model_name, text) for text in texts]
     
-    # Progress bar for paper fetching
-    paper_progress = st.progress(0)
-    progress_text = st.empty()
-    progress_text.text("Fetching papers from multiple sources...")
+    with _EMBEDDING_CACHE_LOCK:
+        cached = {key: _EMBEDDING_CACHE[key] for key in set(keys) if key in _EMBEDDING_CACHE}
+    missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+    
+    if missing:
+        new_embeddings = get_scibert_embeddings(list(missing.values()), tokenizer, model)
+        cached.update(zip(missing, new_embeddings))
+        with _EMBEDDING_CACHE_LOCK:
+            _EMBEDDING_CACHE.update(zip(missing, new_embeddings))
     
-    # Semantic Scholar
+    with _EMBEDDING_CACHE_LOCK:
+        for key in cached:
+            if key in _EMBEDDING_CACHE:
+                _EMBEDDING_CACHE.move_to_end(key)
+        while len(_EMBEDDING_CACHE) > MAX_CACHED_EMBEDDINGS:
+            _EMBEDDING_CACHE.popitem(last=False)
+    
+    if not keys:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack([cached[key] for key in keys])
+
+def prime_embedding_cache(texts, embeddings, model):
+    """Seed the embedding cache with precomputed embeddings, e.g. from a restored analysis."""
+    model_name = getattr(model.config, '_name_or_path', '')
+    with _EMBEDDING_CACHE_LOCK:
+        for text, embedding in zip(texts, embeddings):
+            key = _embedding_cache_key(model_name, text)
+            _EMBEDDING_CACHE[key] = np.asarray(embedding, dtype=np.float32)
+            _EMBEDDING_CACHE.move_to_end(key)
+        while len(_EMBEDDING_CACHE) > MAX_CACHED_EMBEDDINGS:
+            _EMBEDDING_CACHE.popitem(last=False)
+
+# Whole-search deadline: analysis starts with whatever sources have answered by then
+FETCH_DEADLINE = 15
+# Per-request socket timeout for each source
+SOURCE_TIMEOUT = 10
+
+def fetch_semantic_scholar(query, max_results, min_year, since=None, offset=0):
+    """Fetch recent papers with abstracts from Semantic Scholar; returns (papers, warning).
+    
+    With a since date only papers published on or after it are requested.
+    offset skips that many search results, to page past an earlier call.
+    """
+    papers = []
     ss_url = "https://api.semanticscholar.org/graph/v1/paper/search"
-    ss_params = {'query': query, 'limit': limit_per_source * 2, 'fields': 'title,abstract,year,authors'}  # Get more to filter
+    ss_params = {'query': query, 'limit': max_results, 'fields': 'title,abstract,year,authors'}  # Get more to filter
+    if offset:
+        ss_params['offset'] = offset
+    if since:
+        ss_params['publicationDateOrYear'] = f"{since:%Y-%m-%d}:"
     try:
-        response = requests.get(ss_url, params=ss_params, timeout=10)
-        if response.status_code == 200:
-            data = response.json().get('data', [])
-            for p in data:
-                if p.get('abstract') and p.get('year') and int(p.get('year', 0)) >= (current_year - 3):
-                    title = p.get('title', 'Untitled')
-                    abstract = p.get('abstract', '')
-                    year = p.get('year', 'Unknown')
-                    authors = ", ".join([a.get('name', '') for a in p.get('authors', [])[:3]])
-                    if len(p.get('authors', [])) > 3:
+        response = requests.get(ss_url, params=ss_params, timeout=SOURCE_TIMEOUT)
+        if response.status_code != 200:
+            return papers, f"Semantic Scholar returned status code {response.status_code}"
+        data = response.json().get('data', [])
+        for p in data:
+            if p.get('abstract') and p.get('year') and int(p.get('year', 0)) >= min_year:
+                title = p.get('title', 'Untitled')
+                abstract = p.get('abstract', '')
+                year = p.get('year', 'Unknown')
+                authors = ", ".join([a.get('name', '') for a in p.get('authors', [])[:3]])
+                if len(p.get('authors', [])) > 3:
+                    authors += " et al."
+                papers.append({
+                    'title': title,
+                    'abstract': abstract,
+                    'source': 'Semantic Scholar', 
+                    'year': year,
+                    'authors': authors
+                })
+    except Exception as e:
+        return papers, f"Semantic Scholar's acting up—moving on! Error: {str(e)}"
+    return papers, None
+
+def fetch_arxiv(query, max_results, min_year, since=None, offset=0):
+    """Fetch recent papers from arXiv with year filtering; returns (papers, warning).
+    
+    With a since date only papers submitted on or after it are requested, newest first.
+    offset skips that many search results, to page past an earlier call.
+    """
+    papers = []
+    current_year = datetime.now().year
+    arxiv_url = "http://export.arxiv.org/api/query"
+    arxiv_params = {'search_query': f'all:{query} AND submittedDate:[{min_year} TO {current_year}]', 
+                   'max_results': max_results}
+    if offset:
+        arxiv_params['start'] = offset
+    if since:
+        arxiv_params['search_query'] = (f'all:{query} AND submittedDate:'
+                                        f'[{since:%Y%m%d}0000 TO {datetime.now():%Y%m%d}2359]')
+        arxiv_params.update({'sortBy': 'submittedDate', 'sortOrder': 'descending'})
+    try:
+        response = requests.get(arxiv_url, params=arxiv_params, timeout=SOURCE_TIMEOUT)
+        if response.status_code != 200:
+            return papers, f"arXiv returned status code {response.status_code}"
+        root = ET.fromstring(response.text)
+        entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
+        for entry in entries:
+            abstract = entry.findtext('{http://www.w3.org/2005/Atom}summary', '')
+            if abstract:
+                title = entry.findtext('{http://www.w3.org/2005/Atom}title', 'Untitled')
+                published = entry.findtext('{http://www.w3.org/2005/Atom}published', '')
+                year = published[:4] if published else 'Unknown'
+                if year != 'Unknown' and int(year) >= min_year:
+                    authors = ", ".join([author.findtext('{http://www.w3.org/2005/Atom}name', '') 
+                                       for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')[:3]])
+                    if len(entry.findall('.//{http://www.w3.org/2005/Atom}author')) > 3:
                         authors += " et al."
                     papers.append({
                         'title': title,
                         'abstract': abstract,
-                        'source': 'Semantic Scholar', 
+                        'source': 'arXiv',
                         'year': year,
                         'authors': authors
                     })
-        else:
-            st.warning(f"Semantic Scholar returned status code {response.status_code}")
     except Exception as e:
-        st.warning(f"Semantic Scholar's acting up—moving on! Error: {str(e)}")
-    
-    paper_progress.progress(33)
-    progress_text.text("Fetching papers from arXiv...")
+        return papers, f"arXiv's being shy—skipping it! Error: {str(e)}"
+    return papers, None
+
+def fetch_crossref(query, max_results, min_year, since=None, offset=0):
+    """Fetch recent papers with abstracts from CrossRef; returns (papers, warning).
     
-    # arXiv with year filtering
-    arxiv_url = "http://export.arxiv.org/api/query"
-    arxiv_params = {'search_query': f'all:{query} AND submittedDate:[{current_year-3} TO {current_year}]', 
-                   'max_results': limit_per_source * 2}
+    With a since date only works published on or after it are requested.
+    offset skips that many search results, to page past an earlier call.
+    """
+    papers = []
+    cr_url = "https://api.crossref.org/works"
+    year_filter = f"from-pub-date:{since:%Y-%m-%d}" if since else f"from-pub-date:{min_year}"
+    cr_params = {'query': query, 'rows': max_results, 'filter': year_filter}
+    if offset:
+        cr_params['offset'] = offset
     try:
-        response = requests.get(arxiv_url, params=arxiv_params, timeout=10)
-        if response.status_code == 200:
-            root = ET.fromstring(response.text)
-            entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
-            for entry in entries:
-                abstract = entry.findtext('{http://www.w3.org/2005/Atom}summary', '')
-                if abstract:
-                    title = entry.findtext('{http://www.w3.org/2005/Atom}title', 'Untitled')
-                    published = entry.findtext('{http://www.w3.org/2005/Atom}published', '')
-                    year = published[:4] if published else 'Unknown'
-                    if year != 'Unknown' and int(year) >= (current_year - 3):
-                        authors = ", ".join([author.findtext('{http://www.w3.org/2005/Atom}name', '') 
-                                           for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')[:3]])
-                        if len(entry.findall('.//{http://www.w3.org/2005/Atom}author')) > 3:
-                            authors += " et al."
-                        papers.append({
-                            'title': title,
-                            'abstract': abstract,
-                            'source': 'arXiv',
-                            'year': year,
-                            'authors': authors
-                        })
-        else:
-            st.warning(f"arXiv returned status code {response.status_code}")
+        response = requests.get(cr_url, params=cr_params, timeout=SOURCE_TIMEOUT)
+        if response.status_code != 200:
+            return papers, f"CrossRef returned status code {response.status_code}"
+        items = response.json().get('message', {}).get('items', [])
+        for item in items:
+            abstract = re.sub(r'jats:p|<[^>]+>', '', item.get('abstract', '')) if item.get('abstract') else ''
+            if abstract:
+                title = item.get('title', ['Untitled'])[0] if isinstance(item.get('title', []), list) else 'Untitled'
+                year = item.get('published-print', {}).get('date-parts', [['']])[0][0]
+                if not year:
+                    year = item.get('published-online', {}).get('date-parts', [['']])[0][0]
+                year = year or 'Unknown'
+                
+                if year != 'Unknown' and int(year) >= min_year:
+                    authors_list = item.get('author', [])
+                    authors = ", ".join([f"{a.get('given', '')} {a.get('family', '')}" for a in authors_list[:3]])
+                    if len(authors_list) > 3:
+                        authors += " et al."
+                        
+                    papers.append({
+                        'title': title,
+                        'abstract': abstract,
+                        'source': 'CrossRef',
+                        'year': year,
+                        'authors': authors
+                    })
     except Exception as e:
-        st.warning(f"arXiv's being shy—skipping it! Error: {str(e)}")
+        return papers, f"CrossRef's out—sticking with what we've got! Error: {str(e)}"
+    return papers, None
+
+PAPER_SOURCES = [
+    ("Semantic Scholar", fetch_semantic_scholar),
+    ("arXiv", fetch_arxiv),
+    ("CrossRef", fetch_crossref)
+]
+
+def fetch_from_sources(query, limit=75, deadline=FETCH_DEADLINE, since=None, on_result=None, offset=None):
+    """Query all paper sources concurrently; returns (papers, stats, warnings).
     
-    paper_progress.progress(66)
-    progress_text.text("Fetching papers from CrossRef...")
+    Papers are limited to the past 3 years, or to those published since the
+    given date. on_result(name, papers, warning, completed) is called from the
+    calling thread as each source finishes. After `deadline` seconds the
+    sources still running are abandoned. Makes no Streamlit calls, so it can
+    run in background threads.
     
-    # CrossRef with year filter
-    cr_url = "https://api.crossref.org/works"
-    year_filter = f"from-pub-date:{current_year-3}"
-    cr_params = {'query': query, 'rows': limit_per_source * 2, 'filter': year_filter}
+    With an offset (0 for the first page) the call pages instead: it fetches
+    only the results between an earlier call with limit=offset and this limit,
+    and keeps each source's share of that page, so consecutive pages add up to
+    about limit papers in total.
+    """
+    limit_per_source = limit // 3
+    offset_per_source = (offset or 0) // 3
+    min_year = since.year if since else datetime.now().year - 3
+    
+    started = time.monotonic()
+    results = {}
+    warnings = []
+    stats = {name: {'Source': name, 'Status': 'timed out', 'Papers': 0, 'Seconds': None}
+             for name, _ in PAPER_SOURCES}
+    
+    executor = ThreadPoolExecutor(max_workers=len(PAPER_SOURCES))
+    futures = {
+        # Get more to filter
+        executor.submit(fetcher, query, (limit_per_source - offset_per_source) * 2, min_year, since,
+                        offset_per_source * 2): name
+        for name, fetcher in PAPER_SOURCES
+    }
     try:
-        response = requests.get(cr_url, params=cr_params, timeout=10)
-        if response.status_code == 200:
-            items = response.json().get('message', {}).get('items', [])
-            for item in items:
-                abstract = re.sub(r'jats:p|<[^>]+>', '', item.get('abstract', '')) if item.get('abstract') else ''
-                if abstract:
-                    title = item.get('title', ['Untitled'])[0] if isinstance(item.get('title', []), list) else 'Untitled'
-                    year = item.get('published-print', {}).get('date-parts', [['']])[0][0]
-                    if not year:
-                        year = item.get('published-online', {}).get('date-parts', [['']])[0][0]
-                    year = year or 'Unknown'
-                    
-                    if year != 'Unknown' and int(year) >= (current_year - 3):
-                        authors_list = item.get('author', [])
-                        authors = ", ".join([f"{a.get('given', '')} {a.get('family', '')}" for a in authors_list[:3]])
-                        if len(authors_list) > 3:
-                            authors += " et al."
-                            
-                        papers.append({
-                            'title': title,
-                            'abstract': abstract,
-                            'source': 'CrossRef',
-                            'year': year,
-                            'authors': authors
-                        })
-        else:
-            st.warning(f"CrossRef returned status code {response.status_code}")
-    except Exception as e:
-        st.warning(f"CrossRef's out—sticking with what we've got! Error: {str(e)}")
+        for future in as_completed(futures, timeout=deadline):
+            name = futures[future]
+            papers, warning = future.result()
+            results[name] = papers
+            stats[name].update({
+                'Status': 'ok' if warning is None else 'error',
+                'Papers': len(papers),
+                'Seconds': round(time.monotonic() - started, 2)
+            })
+            if warning:
+                warnings.append(warning)
+            if on_result:
+                on_result(name, papers, warning, len(results))
+    except FuturesTimeoutError:
+        late = [n for n, _ in PAPER_SOURCES if n not in results]
+        warnings.append(f"{', '.join(late)} did not respond within {deadline}s—continuing without them.")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    # Keep the usual source order regardless of which answered first
+    if offset is None:
+        papers = [paper for name, _ in PAPER_SOURCES for paper in results.get(name, [])][:limit]
+    else:
+        # Trim per source so every source keeps its share of the page
+        share = limit_per_source - offset_per_source
+        papers = [paper for name, _ in PAPER_SOURCES for paper in results.get(name, [])[:share]]
+        for name in results:
+            stats[name]['Papers'] = min(stats[name]['Papers'], share)
+    return papers, [stats[name] for name, _ in PAPER_SOURCES], warnings
+
+def fetch_papers(query, limit=75, deadline=FETCH_DEADLINE, return_stats=False):
+    """Fetch papers from Semantic Scholar, arXiv, and CrossRef concurrently with year filtering.
+    
+    All sources are queried at once; progress advances as each one finishes and
+    after `deadline` seconds the search continues with whatever has arrived.
+    With return_stats=True, per-source latency and yield are returned as well.
+    """
+    # Progress bar for paper fetching
+    paper_progress = st.progress(0)
+    progress_text = st.empty()
+    progress_text.text("Fetching papers from multiple sources...")
+    
+    def on_result(name, papers, warning, completed):
+        if warning:
+            st.warning(warning)
+        paper_progress.progress(int(100 * completed / len(PAPER_SOURCES)))
+        if completed < len(PAPER_SOURCES):
+            progress_text.text(f"Got {len(papers)} papers from {name}; waiting for the remaining sources...")
+    
+    papers, stats, _ = fetch_from_sources(query, limit, deadline, on_result=on_result)
+    late = [row['Source'] for row in stats if row['Status'] == 'timed out']
+    if late:
+        st.warning(f"{', '.join(late)} did not respond within {deadline}s—continuing without them.")
     
     paper_progress.progress(100)
     progress_text.empty()
     paper_progress.empty()
     
-    return papers[:limit]
+    if return_stats:
+        return papers, stats
+    return papers
+
+class SciBertKeyBERTBackend(BaseEmbedder):
+    """KeyBERT embedding backend that reuses the gap finder's already loaded model."""
+    
+    def __init__(self, tokenizer, model):
+        super().__init__()
+        self.tokenizer = tokenizer
+        self.model = model
+    
+    def embed(self, documents, verbose=False):
+        return get_scibert_embeddings(documents, self.tokenizer, self.model)
+
+@st.cache_resource
+def load_keybert(_tokenizer, _model):
+    """Cache one KeyBERT instance bound to the loaded SciBERT model."""
+    return KeyBERT(model=SciBertKeyBERTBackend(_tokenizer, _model))
 
-def extract_keywords_keybert(abstracts, top_n=20):
-    """Extract keywords using KeyBERT."""
+def embed_candidates(words, kw_model, candidate_cache):
+    """Embed candidate keywords, reusing vectors already in candidate_cache."""
+    missing = [w for w in words if w not in candidate_cache]
+    if missing:
+        candidate_cache.update(zip(missing, kw_model.model.embed(missing)))
+    return np.vstack([candidate_cache[w] for w in words])
+
+def extract_keywords_keybert(abstracts, top_n=20, kw_model=None, doc_embedding=None, candidate_cache=None):
+    """Extract keywords using KeyBERT.
+    
+    kw_model defaults to a fresh KeyBERT(); pass the one from load_keybert to
+    avoid loading another model. doc_embedding (e.g. the normalized mean of the
+    abstracts' embeddings) skips re-embedding the combined text, and
+    candidate_cache (a dict of keyword -> embedding) lets repeated calls share
+    candidate embeddings.
+    """
     with st.spinner("Extracting keywords with KeyBERT..."):
         # Combine abstracts into one large text
         combined_text = " ".join(abstracts)
+        if not combined_text.strip():
+            return []
         
         # Load KeyBERT
-        kw_model = KeyBERT()
+        if kw_model is None:
+            kw_model = KeyBERT()
+        
+        # Candidate keyphrases: single words and bigrams
+        vectorizer = CountVectorizer(ngram_range=(1, 2), stop_words='english')
+        word_embeddings = None
+        if candidate_cache is not None:
+            try:
+                words = vectorizer.fit([combined_text]).get_feature_names_out()
+            except ValueError:
+                return []
+            word_embeddings = embed_candidates(list(words), kw_model, candidate_cache)
         
         # Extract keywords
         keywords = kw_model.extract_keywords(
             combined_text, 
-            keyphrase_ngram_range=(1, 2),  # Allow single words and bigrams
-            stop_words='english',
+            vectorizer=vectorizer,
             use_mmr=True,  # Use Maximal Marginal Relevance for diversity
             diversity=0.5,
-            top_n=top_n
+            top_n=top_n,
+            doc_embeddings=None if doc_embedding is None else np.asarray(doc_embedding).reshape(1, -1),
+            word_embeddings=word_embeddings
         )
         
         # Convert to dictionary with scores
@@ -221,55 +461,186 @@ def extract_keywords_keybert(abstracts, top_n=20):
         
         return sorted_keywords
 
-def simple_dimensionality_reduction(embeddings, n_components=2):
-    """A simple PCA implementation without using sklearn."""
-    # Center the data
-    mean = np.mean(embeddings, axis=0)
-    centered_data = embeddings - mean
+def simple_dimensionality_reduction(embeddings, n_components=2, basis=None):
+    """Project embeddings to n_components dimensions with a randomized PCA.
+    
+    Pass a fitted ProjectionBasis to place papers in its existing layout instead of refitting.
+    """
+    if basis is None or basis.dim != embeddings.shape[1]:
+        basis = ProjectionBasis(n_components).fit(embeddings)
+    return basis.transform(embeddings)
+
+def get_projection_basis(embeddings, key):
+    """Projection basis cached in the session per key, fitted on the first embeddings seen for it.
+    
+    Reusing it keeps the layout stable when the same topic is analyzed again.
+    """
+    bases = st.session_state.setdefault('gap_projection_bases', {})
+    basis = bases.get(key)
+    if basis is None or basis.dim != embeddings.shape[1]:
+        basis = ProjectionBasis().fit(embeddings)
+        bases[key] = basis
+    return basis
+
+# Landscape plot: WebGL above this many points, thinned to roughly MAX_PLOT_POINTS
+WEBGL_THRESHOLD = 1000
+MAX_PLOT_POINTS = 3000
+PLOT_GRID_BINS = 100
+HOVER_TEXT_CHARS = 80
+MAX_GAP_LABELS = 20
+
+def truncate_hover_text(texts, max_chars=HOVER_TEXT_CHARS):
+    """Shorten long strings for hover labels, which are shipped to the browser per point."""
+    texts = pd.Series(texts, dtype=str)
+    return texts.where(texts.str.len() <= max_chars, texts.str.slice(0, max_chars - 1) + "…")
+
+def thin_dense_regions(xy, scores, keep_mask, max_points=MAX_PLOT_POINTS, bins=PLOT_GRID_BINS):
+    """Indices of points to plot: all of keep_mask plus at most max_points others.
+    
+    Points are binned on a bins x bins grid and every cell is capped at the
+    same number of points, so dense regions are thinned while sparse regions
+    and outliers stay intact. Within a cell the lowest-scoring points are kept.
+    """
+    candidates = np.flatnonzero(~keep_mask)
+    kept = np.flatnonzero(keep_mask)
+    if len(candidates) <= max_points:
+        return np.arange(len(xy))
+    
+    # Grid cell of each candidate point
+    span = np.maximum(xy.max(axis=0) - xy.min(axis=0), 1e-12)
+    cells = np.minimum(((xy[candidates] - xy.min(axis=0)) / span * bins).astype(np.int64), bins - 1)
+    cell_ids = cells[:, 0] * bins + cells[:, 1]
     
-    # Compute covariance matrix
-    cov_matrix = np.cov(centered_data, rowvar=False)
+    # Rank of each point within its cell, lowest score first
+    order = np.lexsort((scores[candidates], cell_ids))
+    sorted_cells = cell_ids[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(order)])
+    ranks = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+    
+    # Largest per-cell cap that stays within the point budget
+    low, high = 1, int(group_sizes.max())
+    while low < high:
+        cap = (low + high + 1) // 2
+        if np.minimum(group_sizes, cap).sum() <= max_points:
+            low = cap
+        else:
+            high = cap - 1
+    
+    selected = candidates[order[ranks < low]]
+    return np.sort(np.concatenate([kept, selected]))
+
+def build_landscape_figure(df, hover_columns, gap_indices):
+    """Research landscape scatter plot, switching to WebGL and thinning for large corpora."""
+    is_gap = df['is_gap'].to_numpy()
+    visible = thin_dense_regions(df[['x', 'y']].to_numpy(), df['similarity'].to_numpy(), is_gap)
+    plot_df = df.iloc[visible]
+    render_mode = 'webgl' if len(plot_df) > WEBGL_THRESHOLD else 'svg'
     
-    # Compute eigenvalues and eigenvectors
-    eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
+    title = 'Research Landscape: Potential Gaps in Dark Blue'
+    if len(plot_df) < len(df):
+        title += f" ({len(plot_df):,} of {len(df):,} papers shown)"
     
-    # Sort eigenvectors by eigenvalues in descending order
-    idx = eigenvalues.argsort()[::-1]
-    eigenvectors = eigenvectors[:, idx]
+    # Create interactive scatter plot
+    viz_fig = px.scatter(
+        plot_df, x='x', y='y', 
+        color='similarity', size=(1-plot_df['similarity'])*10+5,
+        hover_data=hover_columns,
+        labels={'similarity': 'Similarity to field center'},
+        color_continuous_scale='Viridis',
+        title=title,
+        render_mode=render_mode
+    )
     
-    # Take the first n_components eigenvectors
-    principal_components = eigenvectors[:, :n_components]
+    # Highlight potential gap papers (always all of them), labelled in ranking order
+    gap_df = df.iloc[list(gap_indices)]
+    gap_trace = px.scatter(
+        gap_df, x='x', y='y',
+        text=[f"Gap {i+1}" if i < MAX_GAP_LABELS else "" for i in range(len(gap_df))],
+        hover_data=['title'],
+        color_discrete_sequence=['red']
+    ).data[0]
     
-    # Project the data
-    projected_data = np.dot(centered_data, principal_components)
+    viz_fig.add_trace(gap_trace)
+    viz_fig.update_traces(marker=dict(line=dict(width=2, color='DarkRed')),
+                         selector=dict(mode='markers+text'))
     
-    return projected_data
+    # Improve layout
+    viz_fig.update_layout(
+        height=500,
+        legend_title_text='Paper Data',
+        xaxis_title="First Principal Component",
+        yaxis_title="Second Principal Component"
+    )
+    return viz_fig
 
-def find_gaps(papers, tokenizer, model, similarity_threshold=0.75, visualization=True):
-    """Use SciBERT to find research gaps with visualizations."""
+def build_gap_figure(papers, embeddings, gap_indices, projection_key=None):
+    """Landscape figure for scored papers (their 'similarity' set) and the gap positions, best first."""
+    # Randomized PCA, reusing the cached basis for this key when there is one
+    basis = get_projection_basis(embeddings, projection_key) if projection_key is not None else None
+    reduced_embeddings = simple_dimensionality_reduction(embeddings, n_components=2, basis=basis)
+    
+    is_gap = np.zeros(len(papers), dtype=bool)
+    is_gap[list(gap_indices)] = True
+    
+    # Create dataframe for plotting
+    df = pd.DataFrame({
+        'x': reduced_embeddings[:, 0],
+        'y': reduced_embeddings[:, 1],
+        'title': truncate_hover_text([p['title'] for p in papers]),
+        'source': [p['source'] for p in papers],
+        'year': [p['year'] for p in papers],
+        'similarity': [p['similarity'] for p in papers],
+        'is_gap': is_gap
+    })
+    hover_columns = ['title', 'source', 'year']
+    # Papers scored by the clustering engine
+    if all('gap_reason' in p for p in papers):
+        df['cluster'] = [p['cluster'] for p in papers]
+        df['gap_reason'] = [p['gap_reason'] for p in papers]
+        hover_columns += ['cluster', 'gap_reason']
+    
+    return build_landscape_figure(df, hover_columns, gap_indices)
+
+def find_gaps(papers, tokenizer, model, similarity_threshold=0.75, visualization=True, return_embeddings=False,
+              method="centroid", projection_key=None):
+    """Use SciBERT to find research gaps with visualizations.
+    
+    method="centroid" (fast) flags papers far from the field center;
+    method="clusters" scores papers with the clustering engine and returns
+    gaps best first. Plots sharing a projection_key (e.g. the topic) reuse one
+    cached projection basis. With return_embeddings=True the normalized abstract
+    embeddings are returned as a third value so later steps can reuse them.
+    """
     if not papers:
-        return [], None
+        return ([], None, None) if return_embeddings else ([], None)
     
     with st.spinner("Analyzing paper embeddings with SciBERT..."):
         abstracts = [p['abstract'] for p in papers]
         
-        # Generate embeddings using SciBERT
-        embeddings = get_scibert_embeddings(abstracts, tokenizer, model)
+        # Generate embeddings using SciBERT, reusing those of abstracts seen before
+        embeddings = get_cached_embeddings(abstracts, tokenizer, model)
         
         # Find the center of the field
         field_center = np.mean(embeddings, axis=0)
         
-        # Calculate similarities to the center
-        similarities = np.dot(embeddings, field_center) / (
-            np.linalg.norm(embeddings, axis=1) * np.linalg.norm(field_center)
-        )
-        
-        # Find outliers
-        outlier_indices = [i for i, s in enumerate(similarities) if s < similarity_threshold]
+        # Calculate similarities to the center (embeddings are already unit length)
+        similarities = np.dot(embeddings, field_center) / max(np.linalg.norm(field_center), 1e-12)
         
-        # If no clear outliers, take the most dissimilar papers
-        if len(outlier_indices) < 3:
-            outlier_indices = similarities.argsort()[:5]
+        if method == "clusters":
+            clustering = cluster_gaps(embeddings)
+            outlier_indices = [int(i) for i in clustering['gap_indices']]
+            for i, paper in enumerate(papers):
+                paper['cluster'] = int(clustering['labels'][i])
+                paper['gap_score'] = float(clustering['gap_scores'][i])
+                paper['gap_reason'] = GAP_REASONS[clustering['reasons'][i]]
+        else:
+            # Find outliers
+            outlier_indices = [i for i, s in enumerate(similarities) if s < similarity_threshold]
+            
+            # If no clear outliers, take the most dissimilar papers
+            if len(outlier_indices) < 3:
+                outlier_indices = similarities.argsort()[:5]
         
         # Add similarity scores to papers
         for i, paper in enumerate(papers):
@@ -281,60 +652,57 @@ def find_gaps(papers, tokenizer, model, similarity_threshold=0.75, visualization
         # Create visualization if requested
         viz_fig = None
         if visualization and len(embeddings) > 5:
-            # Use our simple PCA function 
-            reduced_embeddings = simple_dimensionality_reduction(embeddings, n_components=2)
-            
-            # Create dataframe for plotting
-            df = pd.DataFrame({
-                'x': reduced_embeddings[:, 0],
-                'y': reduced_embeddings[:, 1],
-                'title': [p['title'] for p in papers],
-                'source': [p['source'] for p in papers],
-                'year': [p['year'] for p in papers],
-                'similarity': similarities,
-                'is_gap': [i in outlier_indices for i in range(len(papers))]
-            })
-            
-            # Create interactive scatter plot
-            viz_fig = px.scatter(
-                df, x='x', y='y', 
-                color='similarity', size=(1-df['similarity'])*10+5,
-                hover_data=['title', 'source', 'year'],
-                labels={'similarity': 'Similarity to field center'},
-                color_continuous_scale='Viridis',
-                title='Research Landscape: Potential Gaps in Dark Blue'
-            )
-            
-            # Highlight potential gap papers
-            gap_df = df[df['is_gap']]
-            gap_trace = px.scatter(
-                gap_df, x='x', y='y',
-                text=[f"Gap {i+1}" for i in range(len(gap_df))],
-                color_discrete_sequence=['red']
-            ).data[0]
-            
-            viz_fig.add_trace(gap_trace)
-            viz_fig.update_traces(marker=dict(line=dict(width=2, color='DarkRed')),
-                                 selector=dict(mode='markers+text'))
-            
-            # Improve layout
-            viz_fig.update_layout(
-                height=500,
-                legend_title_text='Paper Data',
-                xaxis_title="First Principal Component",
-                yaxis_title="Second Principal Component"
-            )
+            viz_fig = build_gap_figure(papers, embeddings, outlier_indices, projection_key)
         
+        if return_embeddings:
+            return gap_data, viz_fig, embeddings
         return gap_data, viz_fig
 
-def analyze_keyword_coverage(papers, gap_papers):
-    """Analyze keyword coverage to find potential research gaps using KeyBERT."""
+def mean_doc_embedding(embeddings):
+    """Unit-length mean of normalized embeddings, used as the combined document's embedding."""
+    center = np.mean(embeddings, axis=0)
+    return center / max(np.linalg.norm(center), 1e-12)
+
+def analyze_keyword_coverage(papers, gap_papers, kw_model=None, embeddings=None, embed_fn=None):
+    """Analyze keyword coverage to find potential research gaps.
+    
+    With find_gaps' embeddings and an embed_fn for candidate phrases, keywords
+    are scored per abstract by the scalable KeywordEngine. Otherwise KeyBERT
+    runs on the concatenated abstracts, reusing the cached kw_model and the
+    embeddings when they are passed.
+    """
     all_abstracts = [p['abstract'] for p in papers]
     gap_abstracts = [p['abstract'] for p in gap_papers]
     
-    # Extract keywords from all papers and gap papers using KeyBERT
-    all_keywords = dict(extract_keywords_keybert(all_abstracts, top_n=30))
-    gap_keywords = dict(extract_keywords_keybert(gap_abstracts, top_n=20))
+    gap_idx = []
+    if embeddings is not None and len(embeddings) == len(papers):
+        position = {id(p): i for i, p in enumerate(papers)}
+        gap_idx = [position[id(p)] for p in gap_papers if id(p) in position]
+    
+    all_keywords = gap_keywords = None
+    if embed_fn is not None and gap_idx:
+        try:
+            with st.spinner("Scoring candidate keywords across all abstracts..."):
+                engine = KeywordEngine(all_abstracts, embeddings, embed_fn)
+                all_keywords = dict(engine.keywords(top_n=30))
+                gap_keywords = dict(engine.keywords(gap_idx, top_n=20))
+        except ValueError as e:
+            st.warning(f"Keyword engine failed, falling back to KeyBERT: {str(e)}")
+            all_keywords = gap_keywords = None
+    
+    if all_keywords is None:
+        all_doc_embedding = gap_doc_embedding = candidate_cache = None
+        if kw_model is not None:
+            candidate_cache = {}
+            if gap_idx:
+                all_doc_embedding = mean_doc_embedding(embeddings)
+                gap_doc_embedding = mean_doc_embedding(embeddings[gap_idx])
+        
+        # Extract keywords from all papers and gap papers using KeyBERT
+        all_keywords = dict(extract_keywords_keybert(all_abstracts, top_n=30, kw_model=kw_model,
+                                                     doc_embedding=all_doc_embedding, candidate_cache=candidate_cache))
+        gap_keywords = dict(extract_keywords_keybert(gap_abstracts, top_n=20, kw_model=kw_model,
+                                                     doc_embedding=gap_doc_embedding, candidate_cache=candidate_cache))
     
     # Find keywords that are more prominent in gap papers (potential new directions)
     keyword_opportunities = {}
@@ -356,8 +724,41 @@ def analyze_keyword_coverage(papers, gap_papers):
     
     return sorted_opportunities[:10]  # Return top 10 opportunity keywords
 
-def get_mistral_response(prompt, system_prompt="", api_url="http://localhost:11434/api/generate"):
-    """Get response from locally running Mistral model via Ollama API"""
+OLLAMA_API_URL = "http://localhost:11434/api/generate"
+# Concurrent requests to the local Ollama server; match its OLLAMA_NUM_PARALLEL setting
+OLLAMA_MAX_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", 4))
+# Abstract characters per paper in the batched prompt, keeps it within a small context window
+BATCH_ABSTRACT_CHARS = 1500
+# (connect, read) seconds for Ollama requests; the read timeout also bounds gaps between streamed tokens
+OLLAMA_TIMEOUT = (5, 180)
+# Overall seconds to wait for streamed gap ideas before the unfinished ones fall back
+IDEA_DEADLINE = 300
+# Gap detection engines: distance to the field center, or clustering for larger corpora
+GAP_METHODS = {
+    "centroid": "Fast (distance to field center)",
+    "clusters": "Clusters (mini-batch k-means)"
+}
+# How gap ideas are generated for the gap papers
+IDEA_MODES = {
+    "parallel": "Parallel (streaming)",
+    "batched": "Single batched request",
+    "sequential": "Sequential"
+}
+
+def mistral_cache_key(data):
+    """LLM_CACHE key of an Ollama request, the same for streamed and blocking calls."""
+    params = {'temperature': data["temperature"]}
+    if data.get("format"):
+        params['format'] = data["format"]
+    return make_key("ollama", data["model"], data["prompt"], data["system"], **params)
+
+def get_mistral_response(prompt, system_prompt="", api_url=OLLAMA_API_URL, response_format=None, validate=None):
+    """Get response from locally running Mistral model via Ollama API
+    
+    Pass response_format="json" to have Ollama constrain the output to valid JSON.
+    With validate, a reply is only cached if validate(text) does not raise
+    ValueError; replies that fail are still returned, for the caller to handle.
+    """
     
     headers = {"Content-Type": "application/json"}
     data = {
@@ -367,11 +768,27 @@ def get_mistral_response(prompt, system_prompt="", api_url="http://localhost:114
         "stream": False,
         "temperature": 0.7
     }
+    if response_format:
+        data["format"] = response_format
+    
+    cache_key = mistral_cache_key(data)
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     
     try:
-        response = requests.post(api_url, headers=headers, data=json.dumps(data))
+        response = requests.post(api_url, headers=headers, data=json.dumps(data), timeout=OLLAMA_TIMEOUT)
         if response.status_code == 200:
-            return response.json().get("response", "")
+            text = response.json().get("response", "")
+            if text:
+                try:
+                    if validate:
+                        validate(text)
+                except ValueError:
+                    # Returned uncached; the caller decides how to handle it
+                    return text
+                LLM_CACHE.put(cache_key, text)
+            return text
         else:
             st.warning(f"Error from Mistral API: {response.status_code}")
             return "I couldn't generate gap ideas at this time. Please check your Ollama installation."
@@ -379,8 +796,47 @@ def get_mistral_response(prompt, system_prompt="", api_url="http://localhost:114
         st.warning(f"Error connecting to Ollama API: {e}")
         return "I couldn't connect to the Mistral model. Please make sure Ollama is running."
 
-def generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords):
-    """Generate research gap ideas using Mistral LLM"""
+def stream_mistral_response(prompt, system_prompt="", api_url=OLLAMA_API_URL):
+    """Yield response fragments from the Ollama streaming API as they are generated.
+    
+    Cached responses are yielded whole. Raises on connection or HTTP errors and
+    when the server stalls past OLLAMA_TIMEOUT; safe to call from worker threads.
+    """
+    headers = {"Content-Type": "application/json"}
+    data = {
+        "model": "mistral",
+        "prompt": prompt,
+        "system": system_prompt,
+        "stream": True,
+        "temperature": 0.7
+    }
+    
+    cache_key = mistral_cache_key(data)
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    parts = []
+    with requests.post(api_url, headers=headers, data=json.dumps(data), stream=True,
+                       timeout=OLLAMA_TIMEOUT) as response:
+        response.raise_for_status()
+        # Ollama streams one JSON object per line
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                yield chunk["response"]
+            if chunk.get("done"):
+                # Only complete generations are cached
+                if parts:
+                    LLM_CACHE.put(cache_key, "".join(parts))
+                break
+
+def build_gap_prompt(paper, topic, opportunity_keywords):
+    """Return the (system_prompt, prompt) pair used to ask for gap ideas about a paper."""
     
     # Create a system prompt for research gap analysis
     system_prompt = """You are a research assistant specialized in identifying research gaps and opportunities. 
@@ -407,6 +863,16 @@ def generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords):
     
     Provide concise, specific research gap suggestions (max 3 sentences each).
     """
+    return system_prompt, prompt
+
+def fallback_gap_idea(paper, topic, opportunity_keywords):
+    """Template gap idea used when Mistral is unavailable."""
+    return f"This paper from {paper['year']} differs from mainstream research on {topic.split(':')[0]}. Consider how its methodologies could be applied to solve current challenges in light of emerging keywords like {', '.join([k for k, _ in opportunity_keywords[:2]])}."
+
+def generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords):
+    """Generate research gap ideas using Mistral LLM"""
+    
+    system_prompt, prompt = build_gap_prompt(paper, topic, opportunity_keywords)
     
     # Get response from Mistral
     with st.spinner("Generating research gap ideas with Mistral LLM..."):
@@ -417,10 +883,349 @@ def generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords):
     
     # Fallback if Mistral fails
     if not response or "couldn't" in response:
-        return f"This paper from {paper['year']} differs from mainstream research on {topic.split(':')[0]}. Consider how its methodologies could be applied to solve current challenges in light of emerging keywords like {', '.join([k for k, _ in opportunity_keywords[:2]])}."
+        return fallback_gap_idea(paper, topic, opportunity_keywords)
     
     return response
 
+def build_batch_gap_prompt(papers, topic, opportunity_keywords):
+    """Return a (system_prompt, prompt) pair asking for one gap idea per paper as JSON.
+    
+    The topic, keywords and instructions are sent once for all papers.
+    """
+    system_prompt = """You are a research assistant specialized in identifying research gaps and opportunities. 
+    Analyze the provided research papers and suggest novel research directions and gaps that could be filled.
+    Be specific, innovative, and focus on actionable research ideas. Always answer with valid JSON only."""
+    
+    paper_blocks = "\n".join(
+        f"""
+    PAPER {i}:
+    TITLE: {paper['title']}
+    YEAR: {paper['year']}
+    AUTHORS: {paper['authors']}
+    ABSTRACT: {paper['abstract'][:BATCH_ABSTRACT_CHARS]}
+    """
+        for i, paper in enumerate(papers, 1)
+    )
+    
+    prompt = f"""
+    TOPIC: {topic}
+    
+    EMERGING KEYWORDS IN THE FIELD: {', '.join([k for k, _ in opportunity_keywords[:5]])}
+    {paper_blocks}
+    For EACH paper above, identify 1-2 specific research gaps or opportunities. 
+    Consider:
+    1. How the paper differs from mainstream research
+    2. What questions it raises but doesn't answer
+    3. How the emerging keywords could be integrated with the paper's approach
+    4. What methodological innovations could be applied
+    
+    Keep each paper's suggestions concise (max 3 sentences each).
+    Respond with JSON of exactly this form, one entry per paper:
+    {{"ideas": [{{"paper": 1, "idea": "..."}}, {{"paper": 2, "idea": "..."}}]}}
+    """
+    return system_prompt, prompt
+
+def parse_batch_gap_ideas(response, num_papers):
+    """Parse the batched JSON reply into a list of ideas (None where an idea is missing).
+    
+    Raises ValueError if the reply is not the expected JSON structure.
+    """
+    try:
+        data = json.loads(response)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Reply is not valid JSON: {e}")
+    
+    entries = data.get("ideas") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("Reply has no list of ideas")
+    
+    ideas = [None] * num_papers
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        idea = entry.get("idea")
+        # Accept ideas given as a list of suggestions as well as a single string
+        if isinstance(idea, list):
+            idea = "\n\n".join(str(item) for item in idea)
+        if not isinstance(idea, str) or not idea.strip():
+            continue
+        index = entry.get("paper", position + 1)
+        try:
+            index = int(index) - 1
+        except (TypeError, ValueError):
+            index = position
+        if 0 <= index < num_papers and ideas[index] is None:
+            ideas[index] = idea.strip()
+    
+    if all(idea is None for idea in ideas):
+        raise ValueError("Reply contains no usable ideas")
+    return ideas
+
+def generate_gap_ideas_batched(papers, topic, opportunity_keywords):
+    """Generate gap ideas for all papers with a single JSON-mode Mistral request.
+    
+    Returns a list of ideas in paper order with None for papers the model
+    skipped, or None if the request or parsing failed.
+    """
+    system_prompt, prompt = build_batch_gap_prompt(papers, topic, opportunity_keywords)
+    with st.spinner(f"Generating research gap ideas for {len(papers)} papers with Mistral LLM..."):
+        # Only replies that parse are cached, so a malformed one is retried next time
+        response = get_mistral_response(prompt, system_prompt, response_format="json",
+                                        validate=lambda text: parse_batch_gap_ideas(text, len(papers)))
+    try:
+        return parse_batch_gap_ideas(response, len(papers))
+    except ValueError as e:
+        st.warning(f"Batched gap ideas could not be parsed ({e}); generating them one paper at a time.")
+        return None
+
+def generate_gap_ideas_concurrently(papers, topic, opportunity_keywords, placeholders, max_parallel=OLLAMA_MAX_PARALLEL,
+                                    deadline=IDEA_DEADLINE):
+    """Stream gap ideas for several papers at once into their Streamlit placeholders.
+    
+    Up to max_parallel generations run in worker threads; their tokens are
+    passed back through a queue and rendered here, since only the script
+    thread may update the page. Ideas not finished within deadline seconds
+    get the template fallback. Returns the final ideas in paper order.
+    """
+    updates = queue.Queue()
+    cancelled = threading.Event()
+    
+    def generate(index, paper):
+        if cancelled.is_set():
+            return
+        system_prompt, prompt = build_gap_prompt(paper, topic, opportunity_keywords)
+        try:
+            for token in stream_mistral_response(prompt, system_prompt):
+                if cancelled.is_set():
+                    # Closing the generator closes the streaming response
+                    return
+                updates.put((index, 'token', token))
+            updates.put((index, 'done', None))
+        except Exception as e:
+            updates.put((index, 'error', str(e)))
+    
+    texts = [""] * len(papers)
+    ideas = [None] * len(papers)
+    errors = []
+    for placeholder in placeholders:
+        placeholder.info("Waiting for Mistral...")
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(papers))))
+    for index, paper in enumerate(papers):
+        executor.submit(generate, index, paper)
+    
+    stop_at = time.monotonic() + deadline
+    remaining = len(papers)
+    try:
+        while remaining:
+            try:
+                index, kind, value = updates.get(timeout=max(0.0, stop_at - time.monotonic()))
+            except queue.Empty:
+                break
+            if kind == 'token':
+                texts[index] += value
+                placeholders[index].info(texts[index] + "▌")
+                continue
+            
+            remaining -= 1
+            idea = texts[index].strip()
+            if kind == 'error':
+                errors.append(value)
+            if not idea:
+                idea = fallback_gap_idea(papers[index], topic, opportunity_keywords)
+            ideas[index] = idea
+            placeholders[index].info(idea)
+    finally:
+        # Stop streaming workers and queued papers; never wait on a stalled server
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    timed_out = [index for index, idea in enumerate(ideas) if idea is None]
+    for index in timed_out:
+        ideas[index] = fallback_gap_idea(papers[index], topic, opportunity_keywords)
+        placeholders[index].info(ideas[index])
+    
+    if errors:
+        st.warning(f"Error connecting to Ollama API: {errors[0]}")
+    if timed_out:
+        st.warning(f"{len(timed_out)} gap idea(s) were not ready after {deadline}s; showing template ideas instead.")
+    return ideas
+
+@st.cache_resource
+def get_topic_watcher():
+    """Process-wide topic watcher whose scheduler refreshes watched topics in the background."""
+    tokenizer, model = load_scibert_model()
+    
+    def fetch(topic, since):
+        papers, stats, warnings = fetch_from_sources(topic, since=since)
+        # Keep last_sync unchanged when nothing answered, so the next refresh covers this window
+        if not any(row['Status'] == 'ok' for row in stats):
+            raise RuntimeError("; ".join(warnings) or "No paper source responded")
+        return papers
+    
+    def embed(texts):
+        return get_scibert_embeddings(texts, tokenizer, model)
+    
+    return TopicWatcher(fetch, embed)
+
+def show_topic_watch(topic):
+    """Watch panel: add the current topic, refresh watches and browse their gap papers."""
+    watcher = get_topic_watcher()
+    
+    with st.expander("📡 Topic Watch", expanded=False):
+        st.write("Watched topics are refreshed in the background with papers published since the last sync.")
+        
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            interval = st.number_input("Refresh every (hours)", min_value=1, max_value=24 * 30,
+                                       value=DEFAULT_INTERVAL_HOURS)
+        with col2:
+            st.write("")
+            if st.button("Watch this topic", use_container_width=True) and topic:
+                watcher.add_watch(topic, interval_hours=interval)
+                with st.spinner("Fetching and embedding the initial corpus..."):
+                    try:
+                        result = watcher.refresh(topic)
+                        st.success(f"Watching '{topic}' with {result['total_papers']} papers")
+                    except Exception as e:
+                        st.warning(f"Watch added, but the first sync failed: {e}")
+        
+        watches = watcher.list_watches()
+        if not watches:
+            st.info("No topics watched yet.")
+            return
+        
+        st.dataframe(pd.DataFrame([{
+            'Topic': w['topic'],
+            'Every (h)': w['interval_hours'],
+            'Last Sync': w['last_sync'] or 'pending',
+            'Papers': w['paper_count'],
+            'New Last Sync': w['last_added'],
+            'Error': w['last_error'] or ''
+        } for w in watches]), hide_index=True, use_container_width=True)
+        
+        selected = st.selectbox("Watched topic", [w['topic'] for w in watches])
+        col1, col2 = st.columns(2)
+        if col1.button("Refresh now", use_container_width=True):
+            with st.spinner("Fetching papers published since the last sync..."):
+                try:
+                    result = watcher.refresh(selected)
+                    if result['removed']:
+                        st.info(f"'{selected}' is no longer watched")
+                    else:
+                        st.success(f"{result['new_papers']} new papers ({result['total_papers']} total) "
+                                   f"in {result['seconds']}s")
+                except Exception as e:
+                    st.warning(f"Refresh failed: {e}")
+            # last_sync moved; re-read it so "New" marks this refresh's papers
+            watches = watcher.list_watches()
+        if col2.button("Stop watching", use_container_width=True):
+            watcher.remove_watch(selected)
+            st.rerun()
+        
+        papers, similarities, _ = watcher.gap_scores(selected)
+        if papers:
+            last_sync = next((w['last_sync'] for w in watches if w['topic'] == selected), None)
+            st.markdown("**Top gap candidates**")
+            st.dataframe(pd.DataFrame([{
+                'Title': paper['title'],
+                'Source': paper['source'],
+                'Year': paper['year'],
+                'Similarity': round(float(similarity), 3),
+                'New': paper.get('added_on') == last_sync
+            } for paper, similarity in zip(papers[:10], similarities[:10])]),
+                hide_index=True, use_container_width=True)
+
+def show_landscape(viz_fig):
+    """Render the research landscape plot with its payload metrics."""
+    st.plotly_chart(viz_fig, use_container_width=True)
+    st.caption("Papers further from the center (darker blue) represent potential research gaps")
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Points Plotted", f"{sum(len(trace.x) for trace in viz_fig.data):,}")
+    col2.metric("Renderer", "WebGL" if any(trace.type == 'scattergl' for trace in viz_fig.data) else "SVG")
+    col3.metric("Figure Payload", f"{len(viz_fig.to_json()) / 1024:,.0f} KB")
+
+# Corpus sizes of the progressive mode's stages, smallest first
+PROGRESSIVE_STAGES = (25, 75, 150)
+# Share of the top gaps two consecutive stages must agree on to count as converged
+CONVERGENCE_OVERLAP = 0.8
+
+def run_progressive_analysis(topic, tokenizer, model, similarity_threshold=0.75, visualization=True,
+                             method="centroid", stages=PROGRESSIVE_STAGES):
+    """Coarse-to-fine gap analysis over growing corpora.
+    
+    The landscape and preliminary gaps of the first, small stage are drawn as
+    soon as they are ready and redrawn in place after every later stage. Each
+    later stage fetches only the next page of search results (prefetched while
+    the previous stage is analyzed) and embeds only papers not seen before.
+    Stops once the top gaps agree between two stages; the call returns after
+    the last stage run. Returns (papers, gaps, viz_fig, embeddings,
+    source_stats) for the whole corpus, or None if nothing was found.
+    """
+    status = st.empty()
+    landscape = st.empty()
+    preview = st.empty()
+    
+    papers, seen = [], set()
+    source_stats = {}
+    previous_top = None
+    result = None
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending = executor.submit(fetch_from_sources, topic, stages[0], offset=0)
+    try:
+        for stage, size in enumerate(stages):
+            status.info(f"Stage {stage + 1}/{len(stages)}: growing the corpus to about {size} papers...")
+            fetched, stage_stats, _ = pending.result()
+            # Fetch the next page of results, not the whole larger corpus, while this one is analyzed
+            if stage + 1 < len(stages):
+                pending = executor.submit(fetch_from_sources, topic, stages[stage + 1], offset=size)
+            for row in stage_stats:
+                total = source_stats.get(row['Source'], {}).get('Papers', 0)
+                source_stats[row['Source']] = {**row, 'Papers': total + row['Papers']}
+            
+            for paper in fetched:
+                key = paper_key(paper)
+                if key and key not in seen:
+                    seen.add(key)
+                    papers.append(paper)
+            if not papers:
+                continue
+            
+            gaps, viz_fig, embeddings = find_gaps(papers, tokenizer, model, similarity_threshold, visualization,
+                                                  return_embeddings=True, method=method, projection_key=topic)
+            result = (papers, gaps, viz_fig, embeddings, list(source_stats.values()))
+            
+            top = [paper_key(paper) for paper in gaps[:5]]
+            converged = previous_top is not None and \
+                len(set(top) & set(previous_top)) >= CONVERGENCE_OVERLAP * len(top)
+            previous_top = top
+            last_stage = stage + 1 == len(stages)
+            
+            if converged:
+                status.success(f"✅ Converged: the top gaps agree between the last two stages ({len(papers)} papers).")
+            elif last_stage:
+                status.success(f"✅ Final results from {len(papers)} papers (largest corpus stage reached).")
+            else:
+                status.warning(f"⏳ Preliminary results from {len(papers)} papers - fetching more results to "
+                               f"refine them (stage {stage + 2}/{len(stages)}); gap ideas follow once done...")
+            
+            if viz_fig:
+                with landscape.container():
+                    show_landscape(viz_fig)
+            if not (converged or last_stage):
+                with preview.container():
+                    st.markdown("**Preliminary gap candidates**")
+                    for paper in gaps[:5]:
+                        st.markdown(f"- {paper['title']} ({paper['year']}, similarity {paper['similarity']:.2f})")
+            else:
+                preview.empty()
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return result
+
 def run_gap_finder():
     st.title("🕳️ Research Gap Finder")
     st.write("Discover untapped research opportunities and emerging trends in your field")
@@ -439,29 +1244,81 @@ def run_gap_finder():
                          "Global AI Governance in Healthcare: A Cross-Jurisdictional Regulatory Analysis",
                          help="Enter a specific research topic to find gaps")
     
+    gap_method = st.radio(
+        "Gap detection", list(GAP_METHODS), format_func=GAP_METHODS.get, horizontal=True,
+        help="Clustering also flags small clusters, sparse regions and cluster-edge papers"
+    )
+    idea_mode = st.radio(
+        "Gap idea generation", list(IDEA_MODES), format_func=IDEA_MODES.get, horizontal=True,
+        help="Parallel streams one request per paper at once; batched asks for all ideas in one JSON request"
+    )
+    
+    progressive = st.checkbox("Progressive analysis", value=True,
+                              help="Show preliminary gaps from a small sample first, then refine with more papers")
+    
     search_button = st.button("Find Research Gaps", type="primary", use_container_width=True)
     
-    if search_button:
+    show_topic_watch(topic)
+    
+    with st.expander("📂 Restore a Saved Analysis", expanded=False):
+        saved_analysis = st.file_uploader("Parquet file exported by the gap finder", type=["parquet"])
+        restore_button = st.button("Restore Analysis", disabled=saved_analysis is None)
+    
+    if search_button and progressive:
+        # Steps 1-2 in coarse-to-fine stages
+        result = run_progressive_analysis(topic, tokenizer, model, similarity_threshold, show_visualization,
+                                          method=gap_method)
+        if result is None:
+            st.error("No papers found. Try a broader topic or check your internet connection.")
+            return
+        papers, gaps, viz_fig, embeddings, source_stats = result
+        st.dataframe(pd.DataFrame(source_stats), hide_index=True, use_container_width=True)
+    
+    elif search_button:
         # Step 1: Fetch papers
         with st.spinner("Searching for recent papers (past 3 years)..."):
-            papers = fetch_papers(topic, limit=paper_limit)
+            papers, source_stats = fetch_papers(topic, limit=paper_limit, return_stats=True)
             
             if not papers:
                 st.error("No papers found. Try a broader topic or check your internet connection.")
                 return
             
             st.success(f"Found {len(papers)} papers from the past 3 years related to your topic")
+            st.dataframe(pd.DataFrame(source_stats), hide_index=True, use_container_width=True)
         
         # Step 2: Analyze gaps with SciBERT
-        gaps, viz_fig = find_gaps(papers, tokenizer, model, similarity_threshold, show_visualization)
+        gaps, viz_fig, embeddings = find_gaps(papers, tokenizer, model, similarity_threshold, show_visualization,
+                                              return_embeddings=True, method=gap_method,
+                                              projection_key=topic)
         
         # Show visualization if available
         if viz_fig and show_visualization:
-            st.plotly_chart(viz_fig, use_container_width=True)
-            st.caption("Papers further from the center (darker blue) represent potential research gaps")
+            show_landscape(viz_fig)
+    
+    elif restore_button and saved_analysis is not None:
+        # Steps 1-2 from the saved corpus, without fetching or embedding anything
+        try:
+            papers, embeddings, gap_indices, saved = read_corpus(saved_analysis)
+        except Exception as e:
+            st.error(f"Could not read the saved analysis: {str(e)}")
+            return
+        topic = saved.get('topic', topic)
+        gap_method = saved.get('method', gap_method)
+        gaps = [papers[i] for i in gap_indices]
+        if saved.get('model') == getattr(model.config, '_name_or_path', ''):
+            prime_embedding_cache([paper['abstract'] for paper in papers], embeddings, model)
         
+        st.success(f"Restored {len(papers)} papers on '{topic}' saved {saved.get('created_at', '')}")
+        if show_visualization and len(papers) > 5:
+            show_landscape(build_gap_figure(papers, embeddings, gap_indices, projection_key=topic))
+    
+    if search_button or (restore_button and saved_analysis is not None):
         # Step 3: Advanced keyword analysis with KeyBERT
-        opportunity_keywords = analyze_keyword_coverage(papers, gaps)
+        kw_model = load_keybert(tokenizer, model)
+        opportunity_keywords = analyze_keyword_coverage(
+            papers, gaps, kw_model=kw_model, embeddings=embeddings,
+            embed_fn=lambda texts: get_scibert_embeddings(texts, tokenizer, model, batch_size=CANDIDATE_EMBEDDING_BATCH_SIZE)
+        )
         
         # Show keyword opportunities
         st.subheader("🔍 Emerging Research Keywords")
@@ -497,6 +1354,7 @@ def run_gap_finder():
             """)
         
         # Display gap papers in cards using columns
+        idea_placeholders = []
         for i, paper in enumerate(gaps[:5], 1):
             st.markdown(f"### Gap Opportunity {i}: {paper['title']}")
             
@@ -505,6 +1363,9 @@ def run_gap_finder():
                 st.markdown(f"**Source**: {paper['source']} ({paper['year']})")
                 st.markdown(f"**Authors**: {paper['authors']}")
                 st.markdown(f"**Similarity Score**: {paper['similarity']:.2f}")
+                if 'gap_reason' in paper:
+                    st.markdown(f"**Gap Signal**: {paper['gap_reason']} (cluster {paper['cluster']}, "
+                                f"gap score {paper['gap_score']:.2f})")
                 
                 # Show abstract in expandable section
                 with st.expander("Abstract", expanded=False):
@@ -513,10 +1374,32 @@ def run_gap_finder():
             with col2:
                 # Research gap idea generated by Mistral
                 st.markdown("#### Research Gap Idea")
-                idea = generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords)
-                st.info(idea)
+                if idea_mode == "sequential":
+                    idea = generate_gap_ideas_with_mistral(paper, topic, opportunity_keywords)
+                    st.info(idea)
+                else:
+                    # Filled in below once every card is on the page
+                    idea_placeholders.append(st.empty())
             
             st.divider()
+        
+        if idea_placeholders:
+            gap_papers = gaps[:5]
+            pending = list(range(len(gap_papers)))
+            if idea_mode == "batched":
+                ideas = generate_gap_ideas_batched(gap_papers, topic, opportunity_keywords)
+                if ideas is not None:
+                    for index, idea in enumerate(ideas):
+                        if idea is not None:
+                            idea_placeholders[index].info(idea)
+                    pending = [index for index, idea in enumerate(ideas) if idea is None]
+            
+            # Per-paper requests for parallel mode and for anything the batch missed
+            if pending:
+                generate_gap_ideas_concurrently(
+                    [gap_papers[i] for i in pending], topic, opportunity_keywords,
+                    [idea_placeholders[i] for i in pending]
+                )
             
         # Step 5: Final summary and tips
         st.subheader("✨ Research Strategy Tips")
@@ -528,28 +1411,46 @@ def run_gap_finder():
         4. **Challenge assumptions**: Question why the gap papers differ from the mainstream approach
         """)
         
-        # Prepare data for download
-        download_data = []
-        for paper in papers:
-            download_data.append({
-                'Title': paper['title'],
-                'Source': paper['source'],
-                'Year': paper['year'],
-                'Authors': paper['authors'],
-                'Similarity': paper.get('similarity', 'N/A'),
-                'Is Gap Paper': paper in gaps,
-                'Abstract': paper['abstract']
-            })
+        # Prepare data for download; gap flags come from the gap positions, not list membership
+        position = {id(paper): i for i, paper in enumerate(papers)}
+        gap_indices = [position[id(paper)] for paper in gaps]
+        is_gap = np.zeros(len(papers), dtype=bool)
+        is_gap[gap_indices] = True
         
-        download_df = pd.DataFrame(download_data)
+        download_df = pd.DataFrame({
+            'Title': [paper['title'] for paper in papers],
+            'Source': [paper['source'] for paper in papers],
+            'Year': [paper['year'] for paper in papers],
+            'Authors': [paper['authors'] for paper in papers],
+            'Similarity': [paper.get('similarity', 'N/A') for paper in papers],
+            'Is Gap Paper': is_gap,
+            'Abstract': [paper['abstract'] for paper in papers]
+        })
         csv = download_df.to_csv(index=False)
         
-        st.download_button(
-            label="Download All Paper Data (CSV)",
-            data=csv,
-            file_name=f"research_gaps_{topic.split(':')[0]}.csv",
-            mime="text/csv",
-        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="Download All Paper Data (CSV)",
+                data=csv,
+                file_name=f"research_gaps_{topic.split(':')[0]}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+        with col2:
+            # Parquet keeps the embeddings, so the analysis can be restored later
+            parquet = export_corpus(papers, embeddings, gap_indices, metadata={
+                'topic': topic,
+                'model': getattr(model.config, '_name_or_path', ''),
+                'method': gap_method
+            })
+            st.download_button(
+                label="Download Analysis with Embeddings (Parquet)",
+                data=parquet,
+                file_name=f"research_gaps_{topic.split(':')[0]}.parquet",
+                mime="application/vnd.apache.parquet",
+                use_container_width=True
+            )
 
 
 
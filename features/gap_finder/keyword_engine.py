@@ -0,0 +1,122 @@
+"""
+Scalable keyword extraction for the Research Gap Finder.
+
+Candidate keyphrases are vectorized once over all abstracts into a sparse
+document x candidate matrix. Each unique candidate is embedded once (in
+batches), scored against the embedding of every abstract that contains it,
+and per-candidate scores for any subset of abstracts are aggregated with
+sparse matrix products. Nothing is concatenated into one giant document, so
+every abstract contributes in full and the cost grows with the number of
+(abstract, candidate) pairs rather than with corpus length squared.
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Most frequent candidate phrases kept across the corpus
+MAX_CANDIDATES = 5000
+# Candidates embedded per call of the embedding function
+CANDIDATE_BATCH_SIZE = 512
+# (abstract, candidate) pairs scored per NumPy block, bounds peak memory
+PAIR_BLOCK_SIZE = 200000
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def mmr(candidate_embeddings, relevance, top_n, diversity=0.5):
+    """Maximal Marginal Relevance selection over pre-scored candidates.
+
+    relevance is the aggregated score of each candidate; diversity in [0, 1]
+    trades it off against similarity to keywords already selected.
+    """
+    if len(relevance) == 0:
+        return []
+    top_n = min(top_n, len(relevance))
+    # Put relevance on the same [0, 1] scale as the cosine redundancy term
+    relevance = relevance / max(float(np.max(relevance)), 1e-12)
+    similarity = candidate_embeddings @ candidate_embeddings.T
+    selected = [int(np.argmax(relevance))]
+    remaining = np.ones(len(relevance), dtype=bool)
+    remaining[selected[0]] = False
+    while len(selected) < top_n:
+        redundancy = similarity[:, selected].max(axis=1)
+        mmr_scores = (1 - diversity) * relevance - diversity * redundancy
+        mmr_scores[~remaining] = -np.inf
+        best = int(np.argmax(mmr_scores))
+        selected.append(best)
+        remaining[best] = False
+    return selected
+
+
+class KeywordEngine:
+    """Per-abstract keyword scoring over a whole corpus.
+
+    Args:
+        abstracts: List of abstract strings.
+        doc_embeddings: Array (n_abstracts x dim) of abstract embeddings, e.g.
+            the normalized output of get_scibert_embeddings.
+        embed_fn: Callable mapping a list of strings to an embedding array,
+            used to embed candidate keyphrases.
+    """
+
+    def __init__(self, abstracts, doc_embeddings, embed_fn, ngram_range=(1, 2),
+                 max_candidates=MAX_CANDIDATES, batch_size=CANDIDATE_BATCH_SIZE):
+        self.doc_embeddings = _normalize_rows(np.asarray(doc_embeddings, dtype=np.float32))
+
+        vectorizer = CountVectorizer(ngram_range=ngram_range, stop_words='english',
+                                     max_features=max_candidates, binary=True)
+        presence = vectorizer.fit_transform(abstracts).tocoo()
+        self.candidates = vectorizer.get_feature_names_out()
+
+        # Embed each unique candidate once, in batches
+        blocks = [
+            np.asarray(embed_fn(list(self.candidates[i:i + batch_size])), dtype=np.float32)
+            for i in range(0, len(self.candidates), batch_size)
+        ]
+        self.candidate_embeddings = _normalize_rows(np.vstack(blocks))
+
+        # Relevance of each candidate to each abstract that contains it
+        scores = np.empty(presence.nnz, dtype=np.float32)
+        for start in range(0, presence.nnz, PAIR_BLOCK_SIZE):
+            rows = presence.row[start:start + PAIR_BLOCK_SIZE]
+            cols = presence.col[start:start + PAIR_BLOCK_SIZE]
+            scores[start:start + PAIR_BLOCK_SIZE] = np.einsum(
+                'ij,ij->i', self.doc_embeddings[rows], self.candidate_embeddings[cols]
+            )
+        self.relevance = sparse.csr_matrix((scores, (presence.row, presence.col)), shape=presence.shape)
+
+    def keywords(self, doc_indices=None, top_n=20, diversity=0.5):
+        """Top keywords for a subset of abstracts (all by default) as (keyword, score) pairs.
+
+        A candidate's score is its mean relevance over the subset, counting
+        abstracts that do not contain it as zero, so it rewards phrases that
+        are both widespread and central to the abstracts using them.
+        """
+        n_docs = self.relevance.shape[0]
+        if doc_indices is None:
+            doc_indices = np.arange(n_docs)
+        doc_indices = np.asarray(doc_indices, dtype=np.int64)
+        if len(doc_indices) == 0 or len(self.candidates) == 0:
+            return []
+
+        # Sparse row selection + column sum: one pass over the relevant non-zeros
+        selector = sparse.csr_matrix(
+            (np.full(len(doc_indices), 1.0 / len(doc_indices), dtype=np.float32),
+             (np.zeros(len(doc_indices), dtype=np.int64), doc_indices)),
+            shape=(1, n_docs)
+        )
+        aggregated = np.asarray((selector @ self.relevance).todense()).ravel()
+
+        # Restrict MMR to the strongest candidates present in the subset
+        present = np.flatnonzero(aggregated > 0)
+        if len(present) == 0:
+            return []
+        pool = present[np.argsort(-aggregated[present])[:max(top_n * 5, 50)]]
+        chosen = mmr(self.candidate_embeddings[pool], aggregated[pool], top_n, diversity)
+
+        keywords = [(str(self.candidates[pool[i]]), float(aggregated[pool[i]])) for i in chosen]
+        return sorted(keywords, key=lambda x: x[1], reverse=True)
@@ -0,0 +1,65 @@
+"""
+Low-rank 2-D projection for the gap visualization.
+
+Principal components are found with a randomized SVD on the centered n x d
+embedding matrix. A few power iterations run on a thin random sketch, so no
+d x d covariance matrix is formed and the cost grows as O(n * d * k). A fitted
+ProjectionBasis can be kept and reused to place new papers in the same layout
+without refitting.
+"""
+
+import numpy as np
+
+OVERSAMPLES = 10
+POWER_ITERATIONS = 4
+
+
+def randomized_components(centered, n_components=2, oversamples=OVERSAMPLES,
+                          n_iter=POWER_ITERATIONS, random_state=0):
+    """Top right singular vectors (n_components x d) of an already centered matrix."""
+    n, d = centered.shape
+    sketch_size = min(n_components + oversamples, n, d)
+    rng = np.random.default_rng(random_state)
+
+    # Range finder with power iterations; QR keeps the sketch well conditioned
+    Q = centered @ rng.standard_normal((d, sketch_size)).astype(centered.dtype)
+    Q, _ = np.linalg.qr(Q)
+    for _ in range(n_iter):
+        Z, _ = np.linalg.qr(centered.T @ Q)
+        Q, _ = np.linalg.qr(centered @ Z)
+
+    # Small SVD in the sketched subspace
+    _, _, vt = np.linalg.svd(Q.T @ centered, full_matrices=False)
+    components = vt[:n_components]
+
+    # Fix signs so refits on similar data give the same orientation
+    flip = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    return components * np.where(flip == 0, 1, flip)[:, None]
+
+
+class ProjectionBasis:
+    """Mean and principal directions of a set of embeddings, reusable for new papers."""
+
+    def __init__(self, n_components=2, random_state=0):
+        self.n_components = n_components
+        self.random_state = random_state
+        self.mean = None
+        self.components = None
+
+    @property
+    def dim(self):
+        return None if self.mean is None else len(self.mean)
+
+    def fit(self, embeddings):
+        X = np.asarray(embeddings, dtype=np.float32)
+        self.mean = X.mean(axis=0)
+        self.components = randomized_components(X - self.mean, self.n_components,
+                                                random_state=self.random_state)
+        return self
+
+    def transform(self, embeddings):
+        """Project embeddings onto the fitted basis without refitting."""
+        return (np.asarray(embeddings, dtype=np.float32) - self.mean) @ self.components.T
+
+    def fit_transform(self, embeddings):
+        return self.fit(embeddings).transform(embeddings)
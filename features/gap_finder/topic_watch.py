@@ -0,0 +1,240 @@
+"""
+Topic watches for the Research Gap Finder.
+
+A watch stores a topic's corpus and its embeddings in SQLite. Each refresh
+fetches only papers published since the last sync and embeds just those new
+papers. The sum of all embeddings is also stored, so the field center and
+every paper's similarity to it come from one matrix-vector product, without
+re-embedding the corpus. A background scheduler thread refreshes watches
+when they are due, so each refresh costs time in proportion to the number of
+new papers.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+WATCH_DB_PATH = os.path.join(".cache", "topic_watch.db")
+DEFAULT_INTERVAL_HOURS = 24
+# How often the scheduler looks for due watches
+SCHEDULER_POLL_SECONDS = 60
+# Sources index by day, so each delta fetch re-reads the last day and duplicates are dropped
+SYNC_OVERLAP_DAYS = 1
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def paper_key(paper):
+    """Source-independent identity of a paper, based on its normalized title."""
+    return re.sub(r'[^a-z0-9]+', ' ', paper.get('title', '').lower()).strip()
+
+
+class TopicWatcher:
+    """Persistent topic corpora with incremental refresh and a background scheduler.
+
+    fetch_fn(topic, since) returns a list of paper dicts, where since is a
+    datetime or None for the initial fetch. embed_fn(texts) returns an array
+    of unit-length embeddings.
+    """
+
+    def __init__(self, fetch_fn, embed_fn, db_path=WATCH_DB_PATH, poll_seconds=SCHEDULER_POLL_SECONDS,
+                 start_scheduler=True):
+        self.fetch_fn = fetch_fn
+        self.embed_fn = embed_fn
+        self.db_path = db_path
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        # Serializes refreshes so the scheduler and the UI never sync one topic twice at once
+        self._refresh_lock = threading.Lock()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watches (
+                    topic TEXT PRIMARY KEY,
+                    interval_hours REAL NOT NULL,
+                    created_at TEXT,
+                    last_sync TEXT,
+                    last_added INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    paper_count INTEGER DEFAULT 0,
+                    embedding_sum BLOB
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watch_papers (
+                    topic TEXT NOT NULL REFERENCES watches(topic) ON DELETE CASCADE,
+                    paper_key TEXT NOT NULL,
+                    paper TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    added_on TEXT,
+                    PRIMARY KEY (topic, paper_key)
+                )
+            """)
+
+        if start_scheduler:
+            threading.Thread(target=self._schedule, name="topic-watch-scheduler", daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def add_watch(self, topic, interval_hours=DEFAULT_INTERVAL_HOURS):
+        """Start watching topic; the first refresh fetches its full corpus."""
+        now = datetime.now().strftime(DATE_FORMAT)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO watches (topic, interval_hours, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(topic) DO UPDATE SET interval_hours = excluded.interval_hours",
+                (topic, interval_hours, now)
+            )
+
+    def remove_watch(self, topic):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM watches WHERE topic = ?", (topic,))
+
+    def list_watches(self):
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT topic, interval_hours, last_sync, last_added, last_error, paper_count "
+                "FROM watches ORDER BY created_at"
+            ).fetchall()
+        return [
+            {'topic': row[0], 'interval_hours': row[1], 'last_sync': row[2], 'last_added': row[3],
+             'last_error': row[4], 'paper_count': row[5]}
+            for row in rows
+        ]
+
+    def due_topics(self, now=None):
+        """Topics never synced or whose interval has passed since the last sync."""
+        now = now or datetime.now()
+        due = []
+        for watch in self.list_watches():
+            if not watch['last_sync']:
+                due.append(watch['topic'])
+            elif now - datetime.strptime(watch['last_sync'], DATE_FORMAT) >= timedelta(hours=watch['interval_hours']):
+                due.append(watch['topic'])
+        return due
+
+    def refresh(self, topic):
+        """Fetch and embed papers new since the last sync; returns a summary dict.
+
+        If the watch is removed while the refresh runs, nothing is written and
+        the summary has 'removed' set.
+        """
+        started = time.monotonic()
+        with self._refresh_lock:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT last_sync, paper_count, embedding_sum FROM watches WHERE topic = ?", (topic,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"Topic is not watched: {topic}")
+                known = {key for (key,) in conn.execute(
+                    "SELECT paper_key FROM watch_papers WHERE topic = ?", (topic,)
+                )}
+            last_sync, paper_count, embedding_sum = row
+            since = None
+            if last_sync:
+                since = datetime.strptime(last_sync, DATE_FORMAT) - timedelta(days=SYNC_OVERLAP_DAYS)
+
+            sync_time = datetime.now().strftime(DATE_FORMAT)
+            new_papers = {}
+            for paper in self.fetch_fn(topic, since):
+                key = paper_key(paper)
+                if key and key not in known and key not in new_papers:
+                    new_papers[key] = paper
+
+            embeddings = None
+            if new_papers:
+                embeddings = np.asarray(
+                    self.embed_fn([paper['abstract'] for paper in new_papers.values()]), dtype=np.float32
+                )
+                total = embeddings.sum(axis=0)
+                if embedding_sum is not None:
+                    total += np.frombuffer(embedding_sum, dtype=np.float32)
+                embedding_sum = total.astype(np.float32).tobytes()
+
+            with self._lock, self._connect() as conn:
+                # The watch may have been removed while papers were being fetched
+                if conn.execute("SELECT 1 FROM watches WHERE topic = ?", (topic,)).fetchone() is None:
+                    return {
+                        'topic': topic,
+                        'new_papers': 0,
+                        'total_papers': 0,
+                        'seconds': round(time.monotonic() - started, 2),
+                        'removed': True
+                    }
+                if new_papers:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO watch_papers (topic, paper_key, paper, embedding, added_on) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (topic, key, json.dumps(paper), embedding.tobytes(), sync_time)
+                            for (key, paper), embedding in zip(new_papers.items(), embeddings)
+                        ]
+                    )
+                conn.execute(
+                    "UPDATE watches SET last_sync = ?, last_added = ?, last_error = NULL, "
+                    "paper_count = ?, embedding_sum = ? WHERE topic = ?",
+                    (sync_time, len(new_papers), paper_count + len(new_papers), embedding_sum, topic)
+                )
+
+        return {
+            'topic': topic,
+            'new_papers': len(new_papers),
+            'total_papers': paper_count + len(new_papers),
+            'seconds': round(time.monotonic() - started, 2),
+            'removed': False
+        }
+
+    def corpus(self, topic):
+        """All stored papers of a topic with their embeddings and the time they were added."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT paper, embedding, added_on FROM watch_papers WHERE topic = ? ORDER BY rowid", (topic,)
+            ).fetchall()
+        papers = [dict(json.loads(row[0]), added_on=row[2]) for row in rows]
+        if not rows:
+            return papers, np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        return papers, embeddings
+
+    def gap_scores(self, topic):
+        """Papers of a topic with their similarity to the field center, least similar first.
+
+        The center comes from the stored running embedding sum, so this is
+        one matrix-vector product however large the corpus has grown.
+        """
+        papers, embeddings = self.corpus(topic)
+        if not papers:
+            return papers, np.zeros(0), embeddings
+        with self._lock, self._connect() as conn:
+            (embedding_sum,) = conn.execute(
+                "SELECT embedding_sum FROM watches WHERE topic = ?", (topic,)
+            ).fetchone()
+        center = np.frombuffer(embedding_sum, dtype=np.float32)
+        similarities = embeddings @ center / max(float(np.linalg.norm(center)), 1e-12)
+        order = np.argsort(similarities, kind='stable')
+        return [papers[i] for i in order], similarities[order], embeddings[order]
+
+    def _record_error(self, topic, error):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE watches SET last_error = ? WHERE topic = ?", (error, topic))
+
+    def _schedule(self):
+        while True:
+            for topic in self.due_topics():
+                try:
+                    self.refresh(topic)
+                except Exception as e:
+                    self._record_error(topic, str(e))
+            time.sleep(self.poll_seconds)
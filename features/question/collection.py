@@ -0,0 +1,67 @@
+"""
+Multi-document collections for the Q&A Assistant.
+
+Every document is its own FAISS shard, so adding or removing a paper never
+touches the others, and each shard is the cached per-document vectorstore.
+A query is embedded once, searched on all shards in parallel (FAISS releases
+the GIL while searching), and the per-shard top-k lists are merged into one
+global top-k by distance.
+"""
+
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SEARCH_WORKERS = 8
+
+# Shared by all collections; searches are short, so a small pool serves every session
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="qa-shard-search")
+
+
+class DocumentCollection:
+    """Ordered set of per-document vectorstores built with one embedding model."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._lock = threading.Lock()
+        self._shards = {}
+
+    def __len__(self):
+        return len(self._shards)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._shards
+
+    def add(self, doc_id, name, vectorstore, characters=0):
+        with self._lock:
+            self._shards[doc_id] = {'name': name, 'vectorstore': vectorstore, 'characters': characters}
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._shards.pop(doc_id, None)
+
+    def documents(self):
+        """(doc_id, name, characters) of every document, in the order added."""
+        with self._lock:
+            return [(doc_id, shard['name'], shard['characters']) for doc_id, shard in self._shards.items()]
+
+    def search(self, query, k=3, doc_ids=None):
+        """Global top-k chunks over the collection as (document, distance, doc_name), closest first.
+
+        doc_ids optionally restricts the search to some documents.
+        """
+        with self._lock:
+            shards = [(doc_id, shard) for doc_id, shard in self._shards.items()
+                      if doc_ids is None or doc_id in doc_ids]
+        if not shards:
+            return []
+
+        query_vector = self.embeddings.embed_query(query)
+
+        def search_shard(shard):
+            hits = shard['vectorstore'].similarity_search_with_score_by_vector(query_vector, k=k)
+            return [(doc, float(score), shard['name']) for doc, score in hits]
+
+        per_shard = _SEARCH_POOL.map(search_shard, [shard for _, shard in shards])
+        # Every shard uses the same model and metric, so distances are comparable
+        return heapq.nsmallest(k, (hit for hits in per_shard for hit in hits), key=lambda hit: hit[1])
@@ -0,0 +1,66 @@
+"""
+Selective, parallel OCR for the Q&A Assistant's PDF extraction.
+
+Only pages whose text layer is empty or sparse (scanned pages, figures with
+embedded text) are OCR'd. Each page is rasterized on its own inside a worker
+process and handed to Tesseract as an in-memory PIL image, so no more than
+one page image per worker is held in memory and nothing is written to the
+working directory.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pytesseract
+from pdf2image import convert_from_path
+
+# Pages with fewer extracted characters than this are OCR'd
+SPARSE_PAGE_CHARS = 200
+OCR_DPI = 200
+MAX_OCR_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def sparse_pages(page_texts, min_chars=SPARSE_PAGE_CHARS):
+    """1-based numbers of the pages whose text layer is empty or sparse."""
+    return [i + 1 for i, text in enumerate(page_texts) if len((text or "").strip()) < min_chars]
+
+
+def _init_worker(tesseract_cmd):
+    # One Tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    # Spawned workers (Windows, macOS) do not inherit the parent's configured Tesseract path
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def ocr_page(pdf_path, page_number, dpi=OCR_DPI):
+    """Rasterize one page and OCR it, returning its text."""
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    if not images:
+        return ""
+    return pytesseract.image_to_string(images[0])
+
+
+def ocr_pages(pdf_path, page_numbers, max_workers=MAX_OCR_WORKERS, progress_callback=None):
+    """OCR the given pages across a process pool.
+
+    Returns ({page_number: text}, errors); pages that fail are left out and
+    their error messages collected. progress_callback(done, total) is called
+    as pages finish.
+    """
+    results, errors = {}, []
+    if not page_numbers:
+        return results, errors
+
+    workers = max(1, min(max_workers, len(page_numbers)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pytesseract.pytesseract.tesseract_cmd,)) as executor:
+        futures = {executor.submit(ocr_page, pdf_path, page): page for page in page_numbers}
+        for done, future in enumerate(as_completed(futures), 1):
+            page = futures[future]
+            try:
+                results[page] = future.result()
+            except Exception as e:
+                errors.append(f"page {page}: {e}")
+            if progress_callback:
+                progress_callback(done, len(page_numbers))
+    return results, errors
@@ -5,6 +5,7 @@ import tempfile
 import PyPDF2
 import io
 import google.generativeai as genai
+from utils.gemini_config import configure_gemini
 
 # Try to import optional dependencies with fallbacks
 try:
@@ -17,6 +18,8 @@ try:
     from langchain_community.embeddings import HuggingFaceEmbeddings
     from langchain.text_splitter import RecursiveCharacterTextSplitter
     from langchain_community.vectorstores import FAISS
+    from features.question.vectorstore_cache import VectorstoreCache, document_hash, store_key
+    from features.question.collection import DocumentCollection
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
@@ -45,10 +48,8 @@ if PYTESSERACT_AVAILABLE:
 OCR_AVAILABLE = False
 try:
     if PYTESSERACT_AVAILABLE:
-        import pytesseract
-        from PIL import Image
-    from pdf2image import convert_from_path
-    OCR_AVAILABLE = True
+        from features.question.ocr import ocr_pages, sparse_pages
+        OCR_AVAILABLE = True
 except ImportError:
     pass
 
@@ -56,9 +57,8 @@ except ImportError:
 def configure_gemini_api(api_key: str):
     """Configure Gemini API with the provided key."""
     try:
-        genai.configure(api_key=api_key)
-        # Test the connection by listing models
-        models = list(genai.list_models())
+        # Validated by listing models, cached per key so reruns skip the round trip
+        models = configure_gemini(api_key)
         if models:
             return True
         return False
@@ -130,7 +130,7 @@ def extract_text_with_ocr_if_available(pdf_file):
         st.info("You'll also need to install Poppler on your system.")
         return extract_text_from_pdf(pdf_file)
     
-    full_text = ""
+    temp_file_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
             temp_file.write(pdf_file.getvalue())
@@ -139,37 +139,42 @@ def extract_text_with_ocr_if_available(pdf_file):
         # Standard text extraction
         with open(temp_file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                full_text += text + "\n\n"
+            page_texts = [page.extract_text() or "" for page in pdf_reader.pages]
         
-        # OCR for images in the PDF
-        try:
-            with st.spinner("Performing OCR on images in PDF..."):
-                images = convert_from_path(temp_file_path)
-                for i, image in enumerate(images):
-                    # Save image temporarily
-                    img_path = f"temp_img_{i}.png"
-                    image.save(img_path, "PNG")
-                    
-                    # Perform OCR
-                    img_text = pytesseract.image_to_string(Image.open(img_path))
-                    if img_text.strip():  # Only add if we got meaningful text
-                        full_text += f"\n[Image Content Page {i+1}]: {img_text}\n"
-                    
-                    # Clean up
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
-        except Exception as ocr_e:
-            st.warning(f"OCR processing failed, but basic text extraction succeeded: {ocr_e}")
-            st.info("Proceeding with text-only extraction. To enable OCR, ensure Poppler is properly installed.")
+        # OCR only the pages without a usable text layer, in parallel
+        pages_to_ocr = sparse_pages(page_texts)
+        ocr_texts = {}
+        if pages_to_ocr:
+            try:
+                with st.spinner(f"Performing OCR on {len(pages_to_ocr)} of {len(page_texts)} pages..."):
+                    progress = st.progress(0)
+                    ocr_texts, errors = ocr_pages(
+                        temp_file_path, pages_to_ocr,
+                        progress_callback=lambda done, total: progress.progress(done / total)
+                    )
+                    progress.empty()
+                if errors:
+                    st.warning(f"OCR failed on {len(errors)} page(s): {errors[0]}")
+            except Exception as ocr_e:
+                st.warning(f"OCR processing failed, but basic text extraction succeeded: {ocr_e}")
+                st.info("Proceeding with text-only extraction. To enable OCR, ensure Poppler is properly installed.")
         
-        os.unlink(temp_file_path)  # Delete the temporary file
+        full_text = ""
+        for page_number, text in enumerate(page_texts, 1):
+            full_text += text + "\n\n"
+            img_text = ocr_texts.get(page_number, "")
+            if img_text.strip():  # Only add if we got meaningful text
+                full_text += f"\n[Image Content Page {page_number}]: {img_text}\n"
         return full_text
     except Exception as e:
         st.error(f"Error processing PDF: {e}")
         return ""
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)  # Delete the temporary file
+
+# Sections retrieved across the whole collection per question
+QA_TOP_K = 3
 
 @st.cache_resource
 def load_embeddings_model(model_type="fast"):
@@ -214,8 +219,8 @@ def load_embeddings_model(model_type="fast"):
     # If all models fail, raise an error
     raise Exception(f"Failed to load any {model_type} embedding model. Please check your internet connection.")
 
-def create_vectorstore(text, model_type="fast"):
-    """Create a vector store from the paper text."""
+def get_chunk_settings():
+    """Return (chunk_size, chunk_overlap) from the app config, with defaults."""
     # Import config for chunk sizes with proper path handling
     try:
         import sys
@@ -231,6 +236,11 @@ def create_vectorstore(text, model_type="fast"):
     except (ImportError, KeyError):
         chunk_size = 500  # Smaller chunks for faster processing
         chunk_overlap = 100
+    return chunk_size, chunk_overlap
+
+def create_vectorstore(text, model_type="fast"):
+    """Create a vector store from the paper text."""
+    chunk_size, chunk_overlap = get_chunk_settings()
 
     # Split the text into chunks
     text_splitter = RecursiveCharacterTextSplitter(
@@ -247,6 +257,43 @@ def create_vectorstore(text, model_type="fast"):
     vectorstore = FAISS.from_texts(texts=chunks, embedding=embeddings)
     return vectorstore
 
+@st.cache_resource
+def get_vectorstore_cache():
+    """Process-wide on-disk cache of processed papers' vectorstores."""
+    return VectorstoreCache()
+
+def load_or_create_vectorstore(pdf_file, model_type="fast"):
+    """Vectorstore and text of a PDF, from the disk cache when this paper was processed before.
+
+    Returns (vectorstore, paper_text, cached). Raises ValueError when no text
+    can be extracted.
+    """
+    embeddings = load_embeddings_model(model_type)
+    chunk_size, chunk_overlap = get_chunk_settings()
+    pdf_hash = document_hash(pdf_file.getvalue())
+    key = store_key(pdf_hash, embeddings.model_name, chunk_size, chunk_overlap)
+
+    def build():
+        paper_text = extract_text_with_ocr_if_available(pdf_file)
+        if not paper_text:
+            raise ValueError("Failed to extract text from the PDF.")
+        with st.spinner(f"Creating knowledge base with {model_type} embeddings..."):
+            return create_vectorstore(paper_text, model_type), paper_text
+
+    return get_vectorstore_cache().get_or_create(key, embeddings, build, metadata={
+        'file_name': pdf_file.name,
+        'model': embeddings.model_name,
+        'chunk_size': chunk_size,
+        'chunk_overlap': chunk_overlap
+    })
+
+def get_document_collection(model_type="fast"):
+    """This session's multi-document collection for the given embedding model type."""
+    collections = st.session_state.setdefault('document_collections', {})
+    if model_type not in collections:
+        collections[model_type] = DocumentCollection(load_embeddings_model(model_type))
+    return collections[model_type]
+
 def evaluate_response(reference, candidate):
     """
     Evaluate the quality of the AI response using BLEU score
@@ -322,28 +369,49 @@ def run_research_assistant():
         )
         st.session_state.model_choice = model_choice
 
-    uploaded_file = st.file_uploader("Upload a research paper (PDF)", type="pdf")
+    model_type = getattr(st.session_state, 'model_choice', 'fast')
+    collection = get_document_collection(model_type)
+
+    uploaded_files = st.file_uploader("Upload research papers (PDF)", type="pdf", accept_multiple_files=True)
     
-    if uploaded_file:
-        if st.button("Process Paper"):
-            with st.spinner("Processing PDF..."):
-                paper_text = extract_text_with_ocr_if_available(uploaded_file)
-                if not paper_text:
-                    st.error("Failed to extract text from the PDF. Please try another file.")
-                    return
+    if uploaded_files:
+        if st.button("Process Papers"):
+            for uploaded_file in uploaded_files:
+                # Papers already in the collection are left as they are
+                doc_id = document_hash(uploaded_file.getvalue())
+                if doc_id in collection:
+                    continue
+                with st.spinner(f"Processing {uploaded_file.name}..."):
+                    try:
+                        vectorstore, paper_text, cached = load_or_create_vectorstore(uploaded_file, model_type)
+                    except ValueError:
+                        st.error(f"Failed to extract text from {uploaded_file.name}. Please try another file.")
+                        continue
                 
+                collection.add(doc_id, uploaded_file.name, vectorstore, len(paper_text))
                 st.session_state.paper_text = paper_text
-                st.success(f"Successfully processed paper ({len(paper_text)} characters)")
-                
-                model_type = getattr(st.session_state, 'model_choice', 'fast')
-                with st.spinner(f"Creating knowledge base with {model_type} embeddings..."):
-                    vectorstore = create_vectorstore(paper_text, model_type)
-                    st.session_state.vectorstore = vectorstore
-                    st.success("Paper knowledge base created! You can now ask questions.")
+                if cached:
+                    st.success(f"Loaded the saved knowledge base for {uploaded_file.name} "
+                               f"({len(paper_text)} characters).")
+                else:
+                    st.success(f"Processed {uploaded_file.name} ({len(paper_text)} characters) "
+                               "and created its knowledge base.")
     
-    if 'vectorstore' in st.session_state:
-        st.write("### Ask Questions About Your Paper")
-        question = st.text_input("What would you like to know about this paper?", 
+    if len(collection):
+        documents = collection.documents()
+        with st.expander(f"📚 Your Collection ({len(documents)} papers)", expanded=False):
+            for doc_id, name, characters in documents:
+                col1, col2 = st.columns([5, 1])
+                col1.write(f"📄 {name} ({characters:,} characters)")
+                if col2.button("Remove", key=f"remove_{doc_id}"):
+                    collection.remove(doc_id)
+                    st.rerun()
+        
+        st.write("### Ask Questions About Your Papers")
+        document_names = {doc_id: name for doc_id, name, _ in documents}
+        selected_docs = st.multiselect("Search in", list(document_names), format_func=document_names.get,
+                                       help="Leave empty to search the whole collection")
+        question = st.text_input("What would you like to know about these papers?", 
                                 placeholder="e.g., What is the main conclusion of this study?")
         
         if question and st.button("Get Answer"):
@@ -354,9 +422,14 @@ def run_research_assistant():
 
             with st.spinner("Thinking..."):
                 try:
-                    # Get relevant sections from vector store
-                    docs = st.session_state.vectorstore.similarity_search(question, k=3)
-                    contexts = [doc.page_content for doc in docs]
+                    # Get relevant sections from every paper's shard, merged into one top-k
+                    hits = collection.search(question, k=QA_TOP_K, doc_ids=set(selected_docs) or None)
+                    docs = [doc for doc, _, _ in hits]
+                    if len(documents) > 1:
+                        # Name the source paper of each section when several papers are searched
+                        contexts = [f"[{name}] {doc.page_content}" for doc, _, name in hits]
+                    else:
+                        contexts = [doc.page_content for doc in docs]
                     combined_context = " ".join(contexts)
 
                     # Use Gemini API to answer the question
@@ -391,9 +464,9 @@ def run_research_assistant():
                                f"<p style='color:white; margin:0;'>Response Quality: {bleu:.4f} ({quality})</p></div>", 
                                unsafe_allow_html=True)
                     
-                    with st.expander("See relevant sections from the paper"):
-                        for i, doc in enumerate(docs):
-                            st.markdown(f"**Relevant Section {i+1}:**")
+                    with st.expander("See relevant sections from the papers"):
+                        for i, (doc, _, name) in enumerate(hits):
+                            st.markdown(f"**Relevant Section {i+1}** ({name}):")
                             st.write(doc.page_content)
                             st.write("---")
                     
@@ -401,8 +474,8 @@ def run_research_assistant():
                     st.error(f"Error generating answer: {e}")
                     st.info("Please check your Gemini API key and internet connection.")
 
-    if 'vectorstore' not in st.session_state:
-        st.info("👆 Upload a research paper (PDF) to get started.")
+    if not len(collection):
+        st.info("👆 Upload one or more research papers (PDF) to get started.")
         
         feature_set = "text extraction"
         if OCR_AVAILABLE:
@@ -0,0 +1,137 @@
+"""
+Persistent per-document FAISS vectorstores for the Q&A Assistant.
+
+A processed paper's vectorstore is saved on disk under a key built from the
+PDF's content hash, the embedding model, chunk_size and chunk_overlap, so the
+same paper opened again, by any user, skips text extraction and embedding.
+The FAISS index is memory-mapped on load. Entries are written atomically and
+evicted least recently used first when the cache exceeds its disk budget.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+VECTORSTORE_DIR = os.path.join(".cache", "vectorstores")
+MAX_DISK_BYTES = 2 * 1024 ** 3  # 2 GB
+
+INDEX_NAME = "index"
+TEXT_FILE = "text.txt"
+META_FILE = "meta.json"
+
+
+def document_hash(pdf_bytes):
+    """Content hash of a PDF, independent of its file name."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def store_key(pdf_hash, model_name, chunk_size, chunk_overlap):
+    """Cache key of one document embedded with one model and chunking setup."""
+    parts = json.dumps([pdf_hash, model_name, chunk_size, chunk_overlap])
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()[:32]
+
+
+def load_faiss(path, embeddings):
+    """FAISS.load_local, but with the index memory-mapped instead of read into RAM."""
+    index_path = os.path.join(path, f"{INDEX_NAME}.faiss")
+    try:
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Index types without mmap support are read normally
+        index = faiss.read_index(index_path)
+    # Written by FAISS.save_local in this cache, never by users
+    with open(os.path.join(path, f"{INDEX_NAME}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+class VectorstoreCache:
+    """Disk-budgeted LRU of saved FAISS vectorstores, one directory per key."""
+
+    def __init__(self, root=VECTORSTORE_DIR, max_bytes=MAX_DISK_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def load(self, key, embeddings):
+        """Return (vectorstore, text, metadata) for key, or None if it is not cached."""
+        path = self._path(key)
+        try:
+            vectorstore = load_faiss(path, embeddings)
+            with open(os.path.join(path, TEXT_FILE), encoding="utf-8") as f:
+                text = f.read()
+            with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, RuntimeError, pickle.UnpicklingError, ValueError):
+            return None
+        # Directory mtime doubles as the last-used time for eviction
+        os.utime(path)
+        return vectorstore, text, metadata
+
+    def save(self, key, vectorstore, text, metadata=None):
+        """Store a vectorstore and its source text under key, then enforce the disk budget."""
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            vectorstore.save_local(staging, index_name=INDEX_NAME)
+            with open(os.path.join(staging, TEXT_FILE), "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({**(metadata or {}), 'saved_at': time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+
+            with self._lock:
+                path = self._path(key)
+                if os.path.exists(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                # Atomic, so concurrent readers never see a half-written entry
+                os.replace(staging, path)
+                os.utime(path)
+                self._evict(keep=key)
+        finally:
+            if os.path.exists(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def get_or_create(self, key, embeddings, build_fn, metadata=None):
+        """Load key, or call build_fn() -> (vectorstore, text) and save the result.
+
+        Returns (vectorstore, text, cached).
+        """
+        entry = self.load(key, embeddings)
+        if entry is not None:
+            return entry[0], entry[1], True
+        vectorstore, text = build_fn()
+        self.save(key, vectorstore, text, metadata)
+        return vectorstore, text, False
+
+    def entries(self):
+        """(key, size in bytes, last used) of every cached vectorstore, least recently used first."""
+        entries = []
+        for name in os.listdir(self.root):
+            path = self._path(name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((name, size, os.path.getmtime(path)))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def _evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self._path(name), ignore_errors=True)
+            total -= size
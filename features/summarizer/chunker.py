@@ -0,0 +1,107 @@
+"""
+Tokenizer-aware chunking for the Paper Summarizer.
+
+Sentences are packed greedily into chunks that fill the summarization model's
+input window, with an optional sentence-level overlap between neighbouring
+chunks. Token counts come from the model's own tokenizer when available.
+"""
+
+import math
+import re
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+
+# BART-large-cnn reads at most 1024 tokens per input
+DEFAULT_MAX_TOKENS = 1024
+DEFAULT_OVERLAP_TOKENS = 64
+
+# Rough tokens-per-word ratio used when no tokenizer is available
+WORD_TOKEN_RATIO = 1.3
+
+
+def split_sentences(text):
+    """Split text into non-empty sentences."""
+    return [s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def count_tokens(sentences, tokenizer=None):
+    """Return the token count of each sentence, tokenizing them in one batch."""
+    if not sentences:
+        return []
+    if tokenizer is None:
+        return [math.ceil(len(s.split()) * WORD_TOKEN_RATIO) for s in sentences]
+    encoded = tokenizer(sentences, add_special_tokens=False)['input_ids']
+    return [len(ids) for ids in encoded]
+
+
+def token_budget(tokenizer=None, max_tokens=DEFAULT_MAX_TOKENS):
+    """Usable tokens per chunk once the model limit and special tokens are accounted for."""
+    if tokenizer is None:
+        return max_tokens
+    model_limit = getattr(tokenizer, 'model_max_length', max_tokens) or max_tokens
+    special = tokenizer.num_special_tokens_to_add() if hasattr(tokenizer, 'num_special_tokens_to_add') else 0
+    return max(1, min(max_tokens, model_limit) - special)
+
+
+def _split_long_sentence(sentence, n_tokens, budget):
+    """Break a sentence that alone exceeds the budget into word windows."""
+    words = sentence.split()
+    words_per_piece = max(1, int(len(words) * budget / n_tokens))
+    pieces = []
+    for i in range(0, len(words), words_per_piece):
+        piece = words[i:i + words_per_piece]
+        pieces.append((' '.join(piece), min(budget, math.ceil(n_tokens * len(piece) / len(words)))))
+    return pieces
+
+
+def chunk_text(text, tokenizer=None, max_tokens=DEFAULT_MAX_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+    """Pack the sentences of text into chunks that fit the model's token window.
+
+    Args:
+        text: Section text to chunk.
+        tokenizer: Hugging Face tokenizer of the summarization model, or None
+            to estimate token counts from word counts.
+        max_tokens: Upper bound on tokens per chunk (further capped by the
+            tokenizer's model_max_length).
+        overlap_tokens: Up to this many tokens of trailing sentences are
+            repeated at the start of the next chunk. 0 disables overlap.
+
+    Returns:
+        A list of chunk strings covering the whole text.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    budget = token_budget(tokenizer, max_tokens)
+    overlap_tokens = max(0, min(overlap_tokens, budget // 2))
+
+    units = []
+    for sentence, n_tokens in zip(sentences, count_tokens(sentences, tokenizer)):
+        if n_tokens > budget:
+            units.extend(_split_long_sentence(sentence, n_tokens, budget))
+        else:
+            units.append((sentence, n_tokens))
+
+    chunks = []
+    current, current_tokens = [], 0
+    for unit in units:
+        if current and current_tokens + unit[1] > budget:
+            chunks.append(' '.join(s for s, _ in current))
+
+            # Carry trailing sentences forward as overlap
+            carried, carried_tokens = [], 0
+            for prev in reversed(current):
+                if carried_tokens + prev[1] > overlap_tokens or carried_tokens + prev[1] + unit[1] > budget:
+                    break
+                carried.insert(0, prev)
+                carried_tokens += prev[1]
+            current, current_tokens = carried, carried_tokens
+
+        current.append(unit)
+        current_tokens += unit[1]
+
+    if current:
+        chunks.append(' '.join(s for s, _ in current))
+
+    return chunks
@@ -0,0 +1,185 @@
+"""
+Streaming PDF download manager for the Paper Summarizer's paper sources.
+
+PDFs are streamed in chunks to temporary files instead of being held in
+memory, with a size cap, socket timeouts and an overall deadline. Concurrent
+requests for the same paper share one in-flight download, finished downloads
+are kept in a small on-disk LRU, and several search results can be prefetched
+in parallel. Callers hold a PDF through checkout(); a held file is never
+removed, and one evicted while held is deleted when its last holder is done.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+MAX_PDF_BYTES = 50 * 1024 * 1024      # Refuse PDFs larger than 50 MB
+CONNECT_TIMEOUT = 10                  # Seconds to establish a connection
+READ_TIMEOUT = 30                     # Seconds between received bytes
+DOWNLOAD_DEADLINE = 120               # Seconds for a whole download
+CHUNK_SIZE = 64 * 1024
+MAX_WORKERS = 4
+MAX_CACHED_PDFS = 32
+
+
+class PdfDownloadManager:
+    """Deduplicating, size-capped PDF downloader backed by temporary files."""
+
+    def __init__(self, max_bytes=MAX_PDF_BYTES, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 deadline=DOWNLOAD_DEADLINE, max_workers=MAX_WORKERS, max_cached=MAX_CACHED_PDFS):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_cached = max_cached
+        self.session = requests.Session()
+        self.cache_dir = tempfile.mkdtemp(prefix="paper_pdfs_")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-download")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._completed = OrderedDict()
+        # Holders per file path, and held paths to delete once released
+        self._pins = {}
+        self._doomed = set()
+
+    def _download(self, url, headers=None):
+        """Stream url to a temporary file; return its path, or None if it is not a usable PDF."""
+        path = None
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout,
+                                  allow_redirects=True) as response:
+                if response.status_code != 200:
+                    return None
+
+                length = response.headers.get('Content-Length')
+                if length and length.isdigit() and int(length) > self.max_bytes:
+                    return None
+
+                fd, path = tempfile.mkstemp(suffix=".pdf", dir=self.cache_dir)
+                written = 0
+                started = time.monotonic()
+                with os.fdopen(fd, "wb") as pdf_file:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        # Bail out early on HTML landing pages instead of downloading them
+                        if written == 0 and b"%PDF" not in chunk[:1024]:
+                            raise ValueError("Response is not a PDF")
+                        written += len(chunk)
+                        if written > self.max_bytes:
+                            raise ValueError("PDF exceeds the maximum download size")
+                        if time.monotonic() - started > self.deadline:
+                            raise TimeoutError("PDF download took too long")
+                        pdf_file.write(chunk)
+
+                if not written:
+                    raise ValueError("Empty response")
+                return path
+        except (requests.RequestException, ValueError, TimeoutError, OSError):
+            if path and os.path.exists(path):
+                os.remove(path)
+            return None
+
+    def _run(self, key, resolve):
+        path = None
+        try:
+            request = resolve()
+            if request:
+                url, headers = request
+                path = self._download(url, headers)
+            return path
+        except Exception:
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if path:
+                    self._completed[key] = path
+                    self._completed.move_to_end(key)
+                    self._evict()
+
+    def _evict(self):
+        while len(self._completed) > self.max_cached:
+            _, old_path = self._completed.popitem(last=False)
+            self._discard(old_path)
+
+    def _discard(self, path):
+        # Caller holds self._lock
+        if path in self._pins:
+            self._doomed.add(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def submit(self, key, resolve):
+        """Start (or join) the download for key.
+
+        resolve is called in a worker thread and returns (url, headers) or
+        None; the returned Future resolves to a file path or None.
+        """
+        with self._lock:
+            path = self._completed.get(key)
+            if path and os.path.exists(path):
+                self._completed.move_to_end(key)
+                future = Future()
+                future.set_result(path)
+                return future
+            if key in self._inflight:
+                return self._inflight[key]
+            future = self._executor.submit(self._run, key, resolve)
+            self._inflight[key] = future
+            return future
+
+    @contextmanager
+    def checkout(self, key, resolve):
+        """Download key, wait for it and hold the file for the duration of the with block.
+
+        Yields the PDF's file path, or None if it could not be downloaded.
+        """
+        path = self._pin(key, resolve)
+        try:
+            yield path
+        finally:
+            if path:
+                self._release(path)
+
+    def _pin(self, key, resolve, attempts=2):
+        for _ in range(attempts):
+            path = self.submit(key, resolve).result()
+            if not path:
+                return None
+            with self._lock:
+                # Files are only deleted under the lock, so an existing one stays until released
+                if os.path.exists(path):
+                    self._pins[path] = self._pins.get(path, 0) + 1
+                    return path
+            # Evicted between finishing and being pinned; download it again
+        return None
+
+    def _release(self, path):
+        with self._lock:
+            self._pins[path] -= 1
+            if self._pins[path]:
+                return
+            del self._pins[path]
+            if path in self._doomed:
+                self._doomed.discard(path)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def prefetch(self, requests_by_key):
+        """Start downloads for several {key: resolve} entries without waiting."""
+        return {key: self.submit(key, resolve) for key, resolve in requests_by_key.items()}
+
+    def clear(self):
+        """Remove all cached PDFs from disk; files still held are removed when released."""
+        with self._lock:
+            self._completed.clear()
+            for entry in os.scandir(self.cache_dir):
+                self._discard(entry.path)
+
+
+# One manager per process so downloads are shared across sessions and reruns
+DOWNLOAD_MANAGER = PdfDownloadManager()
@@ -0,0 +1,68 @@
+"""
+Extractive summarization for the Paper Summarizer.
+
+Sentences are embedded as TF-IDF vectors and ranked with TextRank, computed as
+a vectorized power iteration over the sentence similarity matrix in NumPy.
+Runs in milliseconds on CPU, so it serves as an instant preview, a low-load
+mode and the fallback when the abstractive model fails.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from features.summarizer.chunker import split_sentences
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+# Very short fragments (figure labels, equation pieces) make poor summary sentences
+MIN_SENTENCE_WORDS = 5
+
+
+def textrank_scores(similarity, damping=DAMPING, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """PageRank over a dense, symmetric sentence similarity matrix."""
+    n = similarity.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    weights = similarity.astype(np.float64, copy=True)
+    np.fill_diagonal(weights, 0.0)
+    row_sums = weights.sum(axis=1, keepdims=True)
+    # Sentences with no similar neighbours spread their score uniformly
+    transition = np.divide(weights, row_sums, out=np.full_like(weights, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def rank_sentences(sentences):
+    """Return TextRank scores for a list of sentences."""
+    if len(sentences) < 2:
+        return np.ones(len(sentences))
+    try:
+        vectors = TfidfVectorizer(stop_words='english', sublinear_tf=True).fit_transform(sentences)
+    except ValueError:
+        # Only stop words / empty vocabulary
+        return np.ones(len(sentences))
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    similarity = (vectors @ vectors.T).toarray()
+    return textrank_scores(similarity)
+
+
+def extractive_summary(text, num_sentences=3):
+    """Pick the most central sentences of text, returned in their original order."""
+    sentences = [s for s in split_sentences(text) if len(s.split()) >= MIN_SENTENCE_WORDS]
+    if not sentences:
+        return text.strip()
+    if len(sentences) <= num_sentences:
+        return ' '.join(sentences)
+
+    scores = rank_sentences(sentences)
+    top = np.sort(np.argsort(-scores, kind='stable')[:num_sentences])
+    return ' '.join(sentences[i] for i in top)
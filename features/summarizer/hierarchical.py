@@ -0,0 +1,102 @@
+"""
+Map-reduce summarization helpers for full-length papers.
+
+Chunk summaries (map) are computed in one batched model call; a reduce pass
+then condenses them level by level until they fit in a single model input.
+Every model call goes through a content-addressed cache, so re-summarizing a
+paper only recomputes the chunks and levels whose input actually changed.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Chunks per forward pass. The pipeline is not thread-safe, so batching, not
+# threads, is what keeps the model busy
+DEFAULT_BATCH_SIZE = 4
+
+# Reduce passes are capped so latency stays predictable on very long papers
+DEFAULT_MAX_LEVELS = 3
+
+
+class SummaryCache:
+    """Thread-safe LRU cache of model outputs keyed by a hash of input and parameters."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, *params):
+        digest = hashlib.sha256()
+        for param in params:
+            digest.update(repr(param).encode('utf-8'))
+            digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared across PaperSummarizer instances so results survive Streamlit reruns
+SUMMARY_CACHE = SummaryCache()
+
+
+def map_summaries(texts, summarize_fn, cache=SUMMARY_CACHE, cache_params=(), batch_size=DEFAULT_BATCH_SIZE):
+    """Summarize each text, returning results in input order.
+
+    summarize_fn(texts, batch_size) is called once with every text that is not
+    cached and must return their summaries in order without raising; cached and
+    duplicate inputs are only computed once.
+    """
+    results = [None] * len(texts)
+    pending = {}
+    for i, text in enumerate(texts):
+        key = cache.make_key(text, *cache_params)
+        cached = cache.get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(key, (text, []))[1].append(i)
+
+    if pending:
+        summaries = summarize_fn([text for text, _ in pending.values()], batch_size)
+        for (key, (_, positions)), summary in zip(pending.items(), summaries):
+            cache.put(key, summary)
+            for i in positions:
+                results[i] = summary
+
+    return results
+
+
+def reduce_summaries(summaries, summarize_fn, chunk_fn, cache=SUMMARY_CACHE, cache_params=(),
+                     batch_size=DEFAULT_BATCH_SIZE, max_levels=DEFAULT_MAX_LEVELS):
+    """Condense a list of summaries into one, level by level.
+
+    At each level the summaries are concatenated, re-chunked with chunk_fn to
+    fit the model window and summarized again, until a single summary remains
+    or max_levels is reached.
+    """
+    summaries = [s for s in summaries if s]
+    level = 0
+    while len(summaries) > 1 and level < max_levels:
+        chunks = chunk_fn(' '.join(summaries))
+        summaries = map_summaries(chunks, summarize_fn, cache, cache_params, batch_size)
+        level += 1
+    return ' '.join(summaries)
@@ -0,0 +1,183 @@
+"""
+Background job queue for batch paper summarization.
+
+Jobs are persisted in a small SQLite database so their state survives reruns
+and restarts, and are keyed by paper and summary mode so the same request is
+never queued twice, even from different sessions. A pool of worker threads
+drains the queue and keeps the summarization model busy while the Streamlit
+script stays responsive. Workers never touch the Streamlit API; failures and
+warnings are stored on the job record.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+JOB_DB_PATH = os.path.join(".cache", "summarizer_jobs.db")
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def job_key(source_name, paper_id, mode):
+    """Stable identifier for one paper from one source, summarized in one mode."""
+    return f"{source_name}:{paper_id}:{mode}"
+
+
+class SummarizationJobQueue:
+    """Persistent, deduplicating job queue with a worker pool.
+
+    process_fn(paper, source_name, mode, progress, warn) does the actual work:
+    it must return the list of section summaries or raise, may call
+    progress(done, total) as sections complete and warn(message) for problems
+    that did not stop the job. Errors and warnings are stored on the job.
+    """
+
+    def __init__(self, process_fn, db_path=JOB_DB_PATH, num_workers=1, on_enqueue=None):
+        self.process_fn = process_fn
+        self.db_path = db_path
+        self.on_enqueue = on_enqueue
+        self._db_lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._init_db()
+
+        # Resume jobs interrupted by a restart
+        for key in self._keys_with_status(QUEUED, RUNNING):
+            self._update(key, status=QUEUED)
+            self._queue.put(key)
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"summarizer-job-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._db_lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    source_name TEXT NOT NULL,
+                    paper TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    done INTEGER DEFAULT 0,
+                    total INTEGER DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    mode TEXT NOT NULL DEFAULT 'abstractive',
+                    warnings TEXT
+                )
+            """)
+            # Databases from before modes and warnings were stored
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "mode" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN mode TEXT NOT NULL DEFAULT 'abstractive'")
+            if "warnings" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN warnings TEXT")
+
+    def _keys_with_status(self, *statuses):
+        placeholders = ",".join("?" for _ in statuses)
+        with self._db_lock, self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT key FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at", statuses
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _update(self, key, **fields):
+        fields['updated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._db_lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE key = ?", (*fields.values(), key))
+
+    def enqueue(self, paper, source_name, mode="abstractive"):
+        """Queue a paper for summarization in the given mode; returns its job key.
+
+        Requests that are already queued, running or done are not queued again.
+        Failed jobs are retried.
+        """
+        key = job_key(source_name, paper['id'], mode)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._db_lock, self._connect() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row and row[0] != FAILED:
+                return key
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (key, source_name, paper, status, done, total, error, result, "
+                "created_at, updated_at, mode, warnings) VALUES (?, ?, ?, ?, 0, 0, NULL, NULL, ?, ?, ?, NULL)",
+                (key, source_name, json.dumps(paper), QUEUED, now, now, mode)
+            )
+
+        if self.on_enqueue:
+            self.on_enqueue(paper, source_name)
+        self._queue.put(key)
+        return key
+
+    def enqueue_many(self, papers, source_name, mode="abstractive"):
+        """Queue several papers at once, returning their job keys in order."""
+        return [self.enqueue(paper, source_name, mode) for paper in papers]
+
+    def status(self, keys):
+        """Return {key: job dict without the result} for the given job keys."""
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        with self._db_lock, self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT key, source_name, paper, status, done, total, error, updated_at, mode, warnings "
+                f"FROM jobs WHERE key IN ({placeholders})", list(keys)
+            ).fetchall()
+        return {
+            row[0]: {
+                'key': row[0], 'source_name': row[1], 'paper': json.loads(row[2]), 'status': row[3],
+                'done': row[4], 'total': row[5], 'error': row[6], 'updated_at': row[7], 'mode': row[8],
+                'warnings': json.loads(row[9]) if row[9] else []
+            }
+            for row in rows
+        }
+
+    def result(self, key):
+        """Return the stored section summaries of a finished job, or None."""
+        with self._db_lock, self._connect() as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE key = ? AND status = ?", (key, DONE)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return [tuple(item) for item in json.loads(row[0])]
+
+    def pending_count(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            key = self._queue.get()
+            try:
+                job = self.status([key]).get(key)
+                if not job or job['status'] != QUEUED:
+                    continue
+                self._update(key, status=RUNNING, done=0, total=0)
+                warnings = []
+
+                def progress(done, total, key=key):
+                    self._update(key, done=done, total=total)
+
+                summaries = self.process_fn(job['paper'], job['source_name'], job['mode'], progress,
+                                            warnings.append)
+                if summaries is None:
+                    self._update(key, status=FAILED, error="Could not download the paper.")
+                else:
+                    self._update(key, status=DONE, result=json.dumps([list(item) for item in summaries]),
+                                 warnings=json.dumps(warnings) if warnings else None)
+            except Exception as e:
+                self._update(key, status=FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,198 @@
+"""
+Persistent "My Library" store for the Paper Summarizer.
+
+Saved papers live in SQLite instead of session state, so the library survives
+restarts and per-session memory does not grow with it. The store is shared by
+the whole process, so every paper belongs to an owner key (the user's library
+key) and every query is scoped to one owner. Owners not seen for
+LIBRARY_RETENTION_DAYS are pruned with their papers. Papers saved before
+owners existed stay under LEGACY_OWNER until a user claims them. Listing is
+paginated and only reads paper metadata; section summaries are read when a
+paper is opened, and section source text only when its ROUGE scores are
+first needed.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+LIBRARY_DB_PATH = os.path.join(".cache", "my_library.db")
+# Owner of the papers saved when the library was still shared by everyone
+LEGACY_OWNER = ""
+# Libraries whose owner has not been seen for this long are deleted
+LIBRARY_RETENTION_DAYS = 180
+
+
+class PaperLibrary:
+    """SQLite-backed collection of saved paper summaries, partitioned by owner."""
+
+    def __init__(self, db_path=LIBRARY_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,
+                    paper_id TEXT NOT NULL,
+                    title TEXT,
+                    paper TEXT NOT NULL,
+                    added_on TEXT,
+                    UNIQUE (owner, paper_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sections (
+                    library_id INTEGER NOT NULL REFERENCES papers(id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    title TEXT,
+                    summary TEXT,
+                    rouge TEXT,
+                    section_text TEXT,
+                    PRIMARY KEY (library_id, position)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS owners (
+                    owner TEXT PRIMARY KEY,
+                    last_seen TEXT NOT NULL
+                )
+            """)
+        self._migrate_owner_column()
+
+    def _migrate_owner_column(self):
+        """Rebuild a papers table from before owners; its rows are kept under LEGACY_OWNER."""
+        with self._lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(papers)")]
+            if "owner" in columns:
+                return
+            # Foreign keys stay off (the default) so dropping the old table keeps its sections
+            conn.executescript("""
+                BEGIN;
+                CREATE TABLE papers_migrated (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,
+                    paper_id TEXT NOT NULL,
+                    title TEXT,
+                    paper TEXT NOT NULL,
+                    added_on TEXT,
+                    UNIQUE (owner, paper_id)
+                );
+                INSERT INTO papers_migrated (id, owner, paper_id, title, paper, added_on)
+                    SELECT id, '', paper_id, title, paper, added_on FROM papers;
+                DROP TABLE papers;
+                ALTER TABLE papers_migrated RENAME TO papers;
+                COMMIT;
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def touch(self, owner):
+        """Record that owner's library is in use, which keeps it from being pruned."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO owners (owner, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(owner) DO UPDATE SET last_seen = excluded.last_seen", (owner, now)
+            )
+
+    def prune(self, max_idle_days=LIBRARY_RETENTION_DAYS):
+        """Delete the libraries of owners not seen for max_idle_days, and of owners never recorded.
+
+        Legacy papers are kept until they are claimed. Returns the number of papers deleted.
+        """
+        cutoff = (datetime.now() - timedelta(days=max_idle_days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM owners WHERE last_seen < ?", (cutoff,))
+            return conn.execute(
+                "DELETE FROM papers WHERE owner != ? AND owner NOT IN (SELECT owner FROM owners)",
+                (LEGACY_OWNER,)
+            ).rowcount
+
+    def legacy_count(self):
+        """Number of papers saved before libraries had owners and not claimed yet."""
+        return self.count(LEGACY_OWNER)
+
+    def claim_legacy(self, owner):
+        """Move the unclaimed legacy papers into owner's library; returns how many were moved.
+
+        Papers the owner has saved since are kept and the legacy copy is dropped.
+        """
+        with self._lock, self._connect() as conn:
+            moved = conn.execute(
+                "UPDATE papers SET owner = ? WHERE owner = ? AND paper_id NOT IN "
+                "(SELECT paper_id FROM papers WHERE owner = ?)", (owner, LEGACY_OWNER, owner)
+            ).rowcount
+            conn.execute("DELETE FROM papers WHERE owner = ?", (LEGACY_OWNER,))
+        return moved
+
+    def add(self, owner, paper, summaries):
+        """Save a paper and its section summaries, replacing the owner's earlier save of the same paper."""
+        added_on = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM papers WHERE owner = ? AND paper_id = ?", (owner, str(paper['id'])))
+            cursor = conn.execute(
+                "INSERT INTO papers (owner, paper_id, title, paper, added_on) VALUES (?, ?, ?, ?, ?)",
+                (owner, str(paper['id']), paper.get('title', ''), json.dumps(paper), added_on)
+            )
+            library_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO sections (library_id, position, title, summary, rouge, section_text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (library_id, position, item[0], item[1],
+                     json.dumps(item[2]) if len(item) > 2 and item[2] else None,
+                     item[3] if len(item) > 3 else None)
+                    for position, item in enumerate(summaries)
+                ]
+            )
+        return library_id
+
+    def count(self, owner):
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM papers WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def list_papers(self, owner, offset=0, limit=10):
+        """One page of the owner's saved papers (metadata only), newest first."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, paper, added_on FROM papers WHERE owner = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                (owner, limit, offset)
+            ).fetchall()
+        return [{'id': row[0], 'paper': json.loads(row[1]), 'added_on': row[2]} for row in rows]
+
+    def get_summaries(self, owner, library_id):
+        """Section (title, summary, rouge_scores) tuples of a saved paper, without source text."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT s.title, s.summary, s.rouge FROM sections s JOIN papers p ON p.id = s.library_id "
+                "WHERE p.owner = ? AND s.library_id = ? ORDER BY s.position", (owner, library_id)
+            ).fetchall()
+        return [(title, summary, json.loads(rouge) if rouge else None) for title, summary, rouge in rows]
+
+    def get_section_text(self, owner, library_id, position):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT s.section_text FROM sections s JOIN papers p ON p.id = s.library_id "
+                "WHERE p.owner = ? AND s.library_id = ? AND s.position = ?", (owner, library_id, position)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_rouge_scores(self, owner, library_id, position, rouge_scores):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE sections SET rouge = ? WHERE position = ? AND library_id = "
+                "(SELECT id FROM papers WHERE owner = ? AND id = ?)",
+                (json.dumps(rouge_scores), position, owner, library_id)
+            )
+
+    def remove(self, owner, library_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM papers WHERE owner = ? AND id = ?", (owner, library_id))
@@ -14,22 +14,79 @@ from transformers import pipeline
 from bs4 import BeautifulSoup
 import PyPDF2
 import io
+import logging
+import threading
+import secrets
 from datetime import datetime
 import numpy as np
-from rouge_score import rouge_scorer
+from features.summarizer.rouge_eval import calculate_rouge_scores
+from features.summarizer.segmenter import segment, slice_sections
+from features.summarizer.chunker import chunk_text, DEFAULT_MAX_TOKENS, DEFAULT_OVERLAP_TOKENS
+from features.summarizer.downloader import DOWNLOAD_MANAGER
+from features.summarizer.extractive import extractive_summary
+from features.summarizer.library import PaperLibrary
+from features.summarizer.job_queue import SummarizationJobQueue, QUEUED, RUNNING, DONE
+from features.summarizer.hierarchical import SUMMARY_CACHE, DEFAULT_BATCH_SIZE, map_summaries, reduce_summaries
+
+SUMMARIZATION_MODEL = "facebook/bart-large-cnn"
+
+logger = logging.getLogger(__name__)
+
+# Errors the summarization pipeline raises on bad input or a failed generation
+PIPELINE_ERRORS = (RuntimeError, ValueError, IndexError)
+
+# Saved papers listed per page in My Library
+LIBRARY_PAGE_SIZE = 10
+# Query parameter that carries the user's library key, so a bookmarked link reopens the library
+LIBRARY_KEY_PARAM = "library"
+LIBRARY_KEY_MIN_CHARS = 8
+
+# Summary modes offered in the UI
+SUMMARY_MODES = {
+    "Abstractive (BART)": "abstractive",
+    "Full paper (hierarchical)": "hierarchical",
+    "Extractive (instant)": "extractive"
+}
+
+# Number of search results whose PDFs are downloaded in the background
+PREFETCH_RESULTS = 3
+
+# Seconds to wait for a paper source's search or metadata API
+SEARCH_TIMEOUT = 10
 
 class PaperSource:
     def search(self, query, limit=5):
         pass
     
-    def get_paper(self, paper_id):
-        pass
+    def pdf_request(self, paper_id, pdf_url=None):
+        """Return the (url, headers) to download a paper's PDF from, or None."""
+        if pdf_url:
+            return pdf_url, None
+        return None
+    
+    def _download_key(self, paper_id):
+        return (type(self).__name__, paper_id)
+    
+    def open_paper(self, paper_id, pdf_url=None):
+        """Context manager yielding the path of a paper's downloaded PDF, or None.
+        
+        The file is kept on disk until the with block ends.
+        """
+        return DOWNLOAD_MANAGER.checkout(self._download_key(paper_id),
+                                         lambda: self.pdf_request(paper_id, pdf_url))
+    
+    def prefetch(self, papers, limit=PREFETCH_RESULTS):
+        """Start downloading the PDFs of the first few search results in the background."""
+        DOWNLOAD_MANAGER.prefetch({
+            self._download_key(paper['id']): (lambda p=paper: self.pdf_request(p['id'], p.get('pdf_url')))
+            for paper in papers[:limit] if paper.get('id')
+        })
 
 class ArxivSource(PaperSource):
     def search(self, query, limit=5):
         base_url = "http://export.arxiv.org/api/query?"
         search_query = f"search_query=all:{query}&start=0&max_results={limit}"
-        response = requests.get(base_url + search_query)
+        response = requests.get(base_url + search_query, timeout=SEARCH_TIMEOUT)
         
         if response.status_code != 200:
             return []
@@ -57,14 +114,8 @@ class ArxivSource(PaperSource):
         
         return results
     
-    def get_paper(self, paper_id):
-        pdf_url = f"https://arxiv.org/pdf/{paper_id}.pdf"
-        response = requests.get(pdf_url)
-        
-        if response.status_code != 200:
-            return None
-        
-        return response.content
+    def pdf_request(self, paper_id, pdf_url=None):
+        return pdf_url or f"https://arxiv.org/pdf/{paper_id}.pdf", None
 
 class SemanticScholarSource(PaperSource):
     def search(self, query, limit=5):
@@ -72,10 +123,10 @@ class SemanticScholarSource(PaperSource):
         params = {
             "query": query,
             "limit": limit,
-            "fields": "title,abstract,authors,year,url,externalIds"
+            "fields": "title,abstract,authors,year,url,externalIds,openAccessPdf"
         }
         
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=SEARCH_TIMEOUT)
         
         if response.status_code != 200:
             return []
@@ -85,7 +136,7 @@ class SemanticScholarSource(PaperSource):
         
         for paper in data.get('data', []):
             paper_id = paper.get('paperId')
-            arxiv_id = paper.get('externalIds', {}).get('arxiv')
+            arxiv_id = (paper.get('externalIds') or {}).get('arxiv')
             
             results.append({
                 'id': paper_id,
@@ -95,29 +146,25 @@ class SemanticScholarSource(PaperSource):
                 'authors': [author.get('name') for author in paper.get('authors', [])],
                 'published': paper.get('year'),
                 'source': 'semantic_scholar',
-                'url': paper.get('url')
+                'url': paper.get('url'),
+                'pdf_url': (paper.get('openAccessPdf') or {}).get('url')
             })
         
         return results
     
-    def get_paper(self, paper_id):
-        # For Semantic Scholar, we'll try to get the PDF if available
-        # Otherwise, we'll return None and let the app handle it
+    def pdf_request(self, paper_id, pdf_url=None):
+        # Search results already carry the open access PDF link; only look it up when missing
+        if pdf_url:
+            return pdf_url, None
+        
         paper_url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}?fields=openAccessPdf"
-        response = requests.get(paper_url)
+        response = requests.get(paper_url, timeout=SEARCH_TIMEOUT)
         
         if response.status_code != 200:
             return None
         
-        data = response.json()
-        pdf_url = data.get('openAccessPdf', {}).get('url')
-        
-        if pdf_url:
-            pdf_response = requests.get(pdf_url)
-            if pdf_response.status_code == 200:
-                return pdf_response.content
-        
-        return None
+        pdf_url = (response.json().get('openAccessPdf') or {}).get('url')
+        return (pdf_url, None) if pdf_url else None
 
 class CrossrefSource(PaperSource):
     def search(self, query, limit=5):
@@ -128,7 +175,7 @@ class CrossrefSource(PaperSource):
             "sort": "relevance"
         }
         
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=SEARCH_TIMEOUT)
         
         if response.status_code != 200:
             return []
@@ -166,57 +213,53 @@ class CrossrefSource(PaperSource):
         
         return results
     
-    def get_paper(self, paper_id):
+    def pdf_request(self, paper_id, pdf_url=None):
         # For Crossref, we'll try to resolve the DOI and get the PDF
         # This is a simplified approach and may not work for all publishers
-        doi_url = f"https://doi.org/{paper_id}"
-        headers = {
-            'Accept': 'application/pdf'
-        }
-        
-        try:
-            response = requests.get(doi_url, headers=headers, allow_redirects=True)
-            if response.status_code == 200 and response.headers.get('Content-Type') == 'application/pdf':
-                return response.content
-        except:
-            pass
-        
-        return None
+        if pdf_url:
+            return pdf_url, None
+        return f"https://doi.org/{paper_id}", {'Accept': 'application/pdf'}
+
+def notify_streamlit(level, message):
+    """Show a summarizer warning or error in the Streamlit UI (script thread only)."""
+    if level == "error":
+        st.error(message)
+    else:
+        st.warning(message)
 
 class PaperSummarizer:
-    def __init__(self):
-        # Initialize with a smaller model that's more stable for section summarization
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        # Initialize ROUGE scorer
-        self.rouge_scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+    def __init__(self, max_chunk_tokens=DEFAULT_MAX_TOKENS, chunk_overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+        # The abstractive model is loaded on first use, so extractive mode never pays for it
+        self._summarizer = None
+        self._summarizer_lock = threading.Lock()
+        # The pipeline and its fast tokenizer are not thread-safe ("Already borrowed"), so
+        # every call on them, from the job queue worker or the UI, goes through this lock
+        self._pipeline_lock = threading.RLock()
+        # Chunks are sized in model tokens, not characters
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+    
+    @property
+    def summarizer(self):
+        if self._summarizer is None:
+            with self._summarizer_lock:
+                if self._summarizer is None:
+                    # Initialize with a smaller model that's more stable for section summarization
+                    self._summarizer = pipeline("summarization", model=SUMMARIZATION_MODEL)
+        return self._summarizer
+    
+    def generate(self, inputs, **kwargs):
+        """Run the summarization pipeline on a text or a batch of texts, one caller at a time."""
+        summarizer = self.summarizer
+        with self._pipeline_lock:
+            return summarizer(inputs, **kwargs)
     
     def extract_sections(self, text):
-        # Improved section extraction with better pattern matching
-        section_patterns = [
-            r'(?:\n|\r\n|^)(\d+\.\s*\w[\w\s]*?)(?=\n|\r\n)',  # Numbered sections like "1. Introduction"
-            r'(?:\n|\r\n|^)([A-Z][A-Z\s]+)(?=\n|\r\n)',       # ALL CAPS sections
-            r'(?:\n|\r\n|^)(Abstract|Introduction|Related Work|Background|Methodology|Experiments|Results|Discussion|Conclusion|References)(?=\n|\r\n)',  # Common section names
-        ]
-        
-        # First, try to find section headers
-        section_headers = []
-        section_positions = []
-        
-        for pattern in section_patterns:
-            for match in re.finditer(pattern, text):
-                header = match.group(1).strip()
-                if header and len(header) < 100:  # Avoid matching entire paragraphs
-                    section_headers.append(header)
-                    section_positions.append(match.start())
-        
-        # Sort sections by their position in the text
-        if section_headers and section_positions:
-            sorted_sections = sorted(zip(section_headers, section_positions), key=lambda x: x[1])
-            section_headers = [s[0] for s in sorted_sections]
-            section_positions = [s[1] for s in sorted_sections]
+        # Single pass over the text: one compiled pattern, offsets instead of copies
+        section_bounds = segment(text)
         
         # If no headers found, chunk the text by paragraphs
-        if not section_headers:
+        if not section_bounds:
             paragraphs = re.split(r'\n\s*\n', text)
             sections = []
             
@@ -238,27 +281,10 @@ class PaperSummarizer:
             
             return sections
         
-        # If headers found, extract text between headers
-        sections = []
-        for i, header in enumerate(section_headers):
-            if i < len(section_headers) - 1:
-                next_pos = section_positions[i + 1]
-                section_text = text[section_positions[i]:next_pos]
-            else:
-                section_text = text[section_positions[i]:]
-            
-            # Extract actual content (remove the header from the content)
-            header_end = section_text.find('\n')
-            if header_end != -1:
-                content = section_text[header_end:].strip()
-            else:
-                content = section_text.strip()
-            
-            sections.append((header, content))
-        
-        return sections
+        # If headers found, slice each section's content out exactly once
+        return slice_sections(text, section_bounds)
     
-    def summarize_section(self, section_text, max_length=150):
+    def summarize_section(self, section_text, max_length=150, notify=None):
         # Clean up the text
         text = section_text.strip()
         
@@ -266,37 +292,35 @@ class PaperSummarizer:
         if not text or len(text.split()) < 20:
             return "Section is too short to summarize."
         
-        # Limit input length to avoid model errors
-        max_input_length = 1024
-        if len(text.split()) > max_input_length:
-            text = ' '.join(text.split()[:max_input_length])
-        
         try:
-            # Handle the summarization more safely with better error handling
-            chunks = [text[i:i+512] for i in range(0, len(text), 512)]
+            # Pack whole sentences into chunks that fill the model's token window
+            chunks = [c for c in self.chunk_section(text) if len(c.split()) >= 20]
+            if not chunks:
+                chunks = [text]
+            chunk_max_length = max(max_length // len(chunks), 40)
             summaries = []
             
-            for chunk in chunks[:3]:  # Limit to first 3 chunks to avoid excessive processing
-                if len(chunk.split()) < 20:
-                    continue
-                    
-                try:
-                    summary = self.summarizer(chunk, max_length=max_length//len(chunks[:3]), 
-                                            min_length=30, do_sample=False)[0]['summary_text']
-                    summaries.append(summary)
-                except Exception as e:
-                    st.warning(f"Error summarizing chunk: {str(e)}")
-                    # Fall back to extractive summarization when generative fails
-                    sentences = chunk.split('. ')
-                    if len(sentences) > 3:
-                        summaries.append('. '.join(sentences[:3]) + '.')
+            try:
+                # One batched pipeline call for all chunks of the section
+                outputs = self.generate(chunks, max_length=chunk_max_length, min_length=30,
+                                        do_sample=False, truncation=True)
+                summaries = [output['summary_text'] for output in outputs]
+            except Exception as e:
+                (notify or notify_streamlit)("warning", f"Error summarizing chunks: {str(e)}")
+                for chunk in chunks:
+                    try:
+                        summary = self.generate(chunk, max_length=chunk_max_length, min_length=30,
+                                                do_sample=False, truncation=True)[0]['summary_text']
+                        summaries.append(summary)
+                    except Exception:
+                        # Fall back to extractive summarization when generative fails
+                        summaries.append(extractive_summary(chunk))
             
             if summaries:
                 return ' '.join(summaries)
             else:
-                # Fallback to simple extractive summarization
-                sentences = text.split('. ')
-                return '. '.join(sentences[:3]) + '.'
+                # Fallback to extractive summarization
+                return extractive_summary(text)
                 
         except Exception as e:
             # Emergency fallback - just return the first few sentences
@@ -305,19 +329,120 @@ class PaperSummarizer:
                 return '. '.join(sentences[:3]) + '.'
             return f"Could not summarize section: {str(e)}"
     
+    def chunk_section(self, text):
+        """Split section text into sentence-aligned chunks sized by the model's tokenizer."""
+        tokenizer = getattr(self.summarizer, 'tokenizer', None)
+        with self._pipeline_lock:
+            return chunk_text(text, tokenizer, max_tokens=self.max_chunk_tokens,
+                              overlap_tokens=self.chunk_overlap_tokens)
+    
+    def summarize_section_extractive(self, section_text, num_sentences=3):
+        """Instant TextRank summary of a section; needs no model."""
+        text = section_text.strip()
+        if not text or len(text.split()) < 20:
+            return "Section is too short to summarize."
+        return extractive_summary(text, num_sentences=num_sentences)
+    
     def calculate_rouge_scores(self, summary, reference):
         """Calculate ROUGE scores between summary and reference text"""
-        scores = self.rouge_scorer.score(reference, summary)
-        return {
-            'rouge1': scores['rouge1'].fmeasure,
-            'rouge2': scores['rouge2'].fmeasure,
-            'rougeL': scores['rougeL'].fmeasure
-        }
+        return calculate_rouge_scores(summary, reference)
     
-    def summarize_paper(self, pdf_content):
+    def _summarize_chunk(self, chunk, max_length):
+        """Abstractive summary of one model-sized chunk.
+
+        Pipeline errors are logged and the chunk falls back to an extractive summary.
+        """
+        if len(chunk.split()) < 20:
+            return chunk
+        try:
+            return self.generate(chunk, max_length=max_length, min_length=min(30, max_length // 2),
+                                 do_sample=False, truncation=True)[0]['summary_text']
+        except PIPELINE_ERRORS as e:
+            # Fall back to extractive summarization when generative fails
+            logger.warning("Abstractive summary failed, using extractive fallback: %s", e)
+            return extractive_summary(chunk)
+    
+    def _summarize_chunks(self, chunks, max_length, batch_size=DEFAULT_BATCH_SIZE):
+        """Abstractive summaries of model-sized chunks in one batched pipeline call.
+
+        If the batch fails, the chunks are retried one at a time so a single bad
+        chunk only costs its own summary.
+        """
+        summaries = list(chunks)
+        long_chunks = [i for i, chunk in enumerate(chunks) if len(chunk.split()) >= 20]
+        if not long_chunks:
+            return summaries
+        try:
+            outputs = self.generate([chunks[i] for i in long_chunks], max_length=max_length,
+                                    min_length=min(30, max_length // 2), do_sample=False, truncation=True,
+                                    batch_size=batch_size)
+            for i, output in zip(long_chunks, outputs):
+                summaries[i] = output['summary_text']
+        except PIPELINE_ERRORS as e:
+            logger.warning("Batched summary failed, summarizing chunks one at a time: %s", e)
+            for i in long_chunks:
+                summaries[i] = self._summarize_chunk(chunks[i], max_length)
+        return summaries
+    
+    def summarize_sections_hierarchical(self, sections, chunk_max_length=120, section_max_length=200,
+                                        paper_max_length=300, batch_size=DEFAULT_BATCH_SIZE):
+        """Map-reduce summarization covering every section of a long paper.
+        
+        All chunks of all sections are summarized in one batched model call (map),
+        each section's chunk summaries are condensed into a section summary and the
+        section summaries into a paper overview (reduce). Every step is cached by
+        content hash, so unchanged chunks and levels are not recomputed.
+        """
+        cache_params = (SUMMARIZATION_MODEL, self.max_chunk_tokens, self.chunk_overlap_tokens)
+        
+        def summarize_with(max_length):
+            return lambda chunks, batch_size: self._summarize_chunks(chunks, max_length, batch_size)
+        
+        # Map: chunk every section, then summarize all chunks together
+        section_chunks = [self.chunk_section(section_text) for _, section_text in sections]
+        all_chunks = [chunk for chunks in section_chunks for chunk in chunks]
+        chunk_summaries = map_summaries(all_chunks, summarize_with(chunk_max_length), SUMMARY_CACHE,
+                                        cache_params + (chunk_max_length,), batch_size)
+        
+        # Reduce: per section, then across sections for the whole paper
+        summaries = []
+        section_summaries = []
+        offset = 0
+        for (section_title, section_text), chunks in zip(sections, section_chunks):
+            partials = chunk_summaries[offset:offset + len(chunks)]
+            offset += len(chunks)
+            if not partials:
+                summaries.append((section_title, "Section is too short to summarize.", None, section_text))
+                continue
+            section_summary = reduce_summaries(partials, summarize_with(section_max_length), self.chunk_section,
+                                               SUMMARY_CACHE, cache_params + (section_max_length,), batch_size)
+            section_summaries.append(section_summary)
+            summaries.append((section_title, section_summary, None, section_text))
+        
+        overview = reduce_summaries(section_summaries, summarize_with(paper_max_length), self.chunk_section,
+                                    SUMMARY_CACHE, cache_params + (paper_max_length,), batch_size)
+        if overview:
+            full_text = "\n\n".join(section_text for _, section_text in sections)
+            summaries.insert(0, ("Paper Overview", overview, None, full_text))
+        
+        return summaries
+    
+    def summarize_paper(self, pdf_content, mode="abstractive", progress_callback=None, notify=None):
+        """Summarize a PDF (bytes or path) section by section.
+        
+        Problems are reported through notify(level, message), with level "warning"
+        or "error"; by default they are shown in the Streamlit UI. Pass another
+        callable when running off the script thread. A paper that cannot be read
+        yields a single ("Error", message) entry.
+        """
+        notify = notify or notify_streamlit
         # Extract text from PDF with better error handling
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+            # Accept raw bytes (uploads) or the path of a downloaded PDF
+            if isinstance(pdf_content, (bytes, bytearray)):
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+            else:
+                pdf_reader = PyPDF2.PdfReader(pdf_content)
             text = ""
             for page in pdf_reader.pages:
                 try:
@@ -325,46 +450,199 @@ class PaperSummarizer:
                     if extracted:
                         text += extracted + "\n\n"
                 except Exception as e:
-                    st.warning(f"Error extracting text from page: {str(e)}")
+                    notify("warning", f"Error extracting text from page: {str(e)}")
             
             if not text:
-                st.error("Could not extract text from the PDF")
+                notify("error", "Could not extract text from the PDF")
                 return [("Error", "Failed to extract text from the PDF.")]
         except Exception as e:
-            st.error(f"Error processing PDF: {str(e)}")
+            notify("error", f"Error processing PDF: {str(e)}")
             return [("Error", f"Failed to process the PDF: {str(e)}")]
         
         # Extract sections with error handling
         try:
             sections = self.extract_sections(text)
         except Exception as e:
-            st.error(f"Error extracting sections: {str(e)}")
+            notify("error", f"Error extracting sections: {str(e)}")
             # Fallback to simple paragraphs
             paragraphs = text.split('\n\n')
             sections = [(f"Section {i+1}", p) for i, p in enumerate(paragraphs) if len(p.strip()) > 100]
             if not sections:
                 return [("Error", "Failed to identify sections in the paper.")]
         
+        if mode == "hierarchical":
+            try:
+                summaries = self.summarize_sections_hierarchical(sections)
+                if progress_callback:
+                    progress_callback(len(sections), len(sections))
+                return summaries
+            except Exception as e:
+                notify("warning", f"Hierarchical summarization failed, summarizing section by section: {str(e)}")
+        
         # Summarize each section with proper error handling
         summaries = []
-        for section_title, section_text in sections:
+        for i, (section_title, section_text) in enumerate(sections):
+            if progress_callback:
+                progress_callback(i, len(sections))
             try:
-                summary = self.summarize_section(section_text)
-                
-                # Calculate ROUGE scores comparing summary to original text
-                rouge_scores = self.calculate_rouge_scores(summary, section_text)
+                if mode == "extractive":
+                    summary = self.summarize_section_extractive(section_text)
+                else:
+                    summary = self.summarize_section(section_text, notify=notify)
                 
-                summaries.append((section_title, summary, rouge_scores, section_text))
+                # ROUGE scores are computed lazily when the metrics panel is opened
+                summaries.append((section_title, summary, None, section_text))
             except Exception as e:
                 # Provide a graceful fallback for failed summaries
-                st.warning(f"Error summarizing section '{section_title}': {str(e)}")
+                notify("warning", f"Error summarizing section '{section_title}': {str(e)}")
                 first_sentences = '. '.join(section_text.split('. ')[:3])
                 if first_sentences:
                     summaries.append((section_title, first_sentences + '...', None, section_text))
                 else:
                     summaries.append((section_title, "Summary unavailable.", None, section_text))
         
+        if progress_callback:
+            progress_callback(len(sections), len(sections))
+        return summaries
+
+def get_paper_sources():
+    """Paper sources available in the summarizer, by display name."""
+    return {
+        "arXiv": ArxivSource(),
+        "Semantic Scholar": SemanticScholarSource(),
+        "Crossref": CrossrefSource()
+    }
+
+@st.cache_resource
+def load_summarizer():
+    """Load and cache the summarization model once per process."""
+    return PaperSummarizer()
+
+@st.cache_resource
+def get_library():
+    """Shared on-disk store behind My Library; abandoned libraries are pruned once per process."""
+    library = PaperLibrary()
+    library.prune()
+    return library
+
+def get_query_param(name):
+    if hasattr(st, "query_params"):
+        return st.query_params.get(name)
+    values = st.experimental_get_query_params().get(name)
+    return values[0] if values else None
+
+def set_query_param(name, value):
+    if hasattr(st, "query_params"):
+        st.query_params[name] = value
+    else:
+        st.experimental_set_query_params(**{name: value})
+
+def use_library_key(key):
+    """Make key this session's library key and keep it in the page URL."""
+    st.session_state.library_owner = key
+    set_query_param(LIBRARY_KEY_PARAM, key)
+    get_library().touch(key)
+
+def library_owner():
+    """Library key that scopes My Library.
+    
+    It is read from the page URL, so a bookmarked link or reload reopens the
+    same library after a restart; a first visit gets a new random key.
+    """
+    if "library_owner" not in st.session_state:
+        use_library_key(get_query_param(LIBRARY_KEY_PARAM) or secrets.token_urlsafe(12))
+    return st.session_state.library_owner
+
+def show_library_key(library, owner):
+    """Show the library key, let the user open another library by key, and claim legacy papers."""
+    with st.expander("Library key"):
+        st.caption("Your library is tied to this key, which is also kept in the page URL. "
+                   "Bookmark the page or note the key to reopen your library later or on another device.")
+        st.code(owner)
+        entered = st.text_input("Open a library by its key", key="library_key_input").strip()
+        if st.button("Open Library") and entered:
+            if len(entered) < LIBRARY_KEY_MIN_CHARS:
+                st.error(f"Library keys have at least {LIBRARY_KEY_MIN_CHARS} characters.")
+            else:
+                use_library_key(entered)
+                st.session_state.library_page = 0
+                st.rerun()
+        
+        legacy = library.legacy_count()
+        if legacy and st.button(f"Move {legacy} paper(s) saved before library keys into this library"):
+            library.claim_legacy(owner)
+            st.rerun()
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide background queue that summarizes papers with the cached model."""
+    summarizer = load_summarizer()
+    sources = get_paper_sources()
+    
+    def process(paper, source_name, mode, progress, warn):
+        errors = []
+        
+        # Runs on a worker thread: problems go to the job record, never to st.*
+        def notify(level, message):
+            if level == "error":
+                errors.append(message)
+            else:
+                warn(message)
+        
+        with sources[source_name].open_paper(paper['id'], paper.get('pdf_url')) as pdf_path:
+            if not pdf_path:
+                return None
+            summaries = summarizer.summarize_paper(pdf_path, mode=mode, progress_callback=progress,
+                                                   notify=notify)
+        if len(summaries) == 1 and summaries[0][0] == "Error":
+            raise RuntimeError(errors[0] if errors else summaries[0][1])
+        for message in errors:
+            warn(message)
         return summaries
+    
+    def prefetch(paper, source_name):
+        # Download queued papers while the model works on earlier ones
+        sources[source_name].prefetch([paper])
+    
+    return SummarizationJobQueue(process, on_enqueue=prefetch)
+
+def show_extractive_preview(summarizer, pdf_content, mode):
+    """Show an instant extractive summary while the abstractive model runs; returns its placeholder."""
+    placeholder = st.empty()
+    if mode == "extractive":
+        return placeholder
+    
+    preview = summarizer.summarize_paper(pdf_content, mode="extractive")
+    with placeholder.container():
+        st.info("Instant extractive preview - the full summary will replace it when ready.")
+        for item in preview:
+            st.markdown(f"**{item[0]}**")
+            st.write(item[1])
+    return placeholder
+
+def get_section_rouge_scores(summaries, index):
+    """Return ROUGE scores for one section, computing and storing them on first use."""
+    item = summaries[index]
+    if len(item) < 4:
+        return None
+    
+    section_title, summary, rouge_scores, section_text = item[:4]
+    if rouge_scores is None:
+        rouge_scores = calculate_rouge_scores(summary, section_text)
+        summaries[index] = (section_title, summary, rouge_scores, section_text)
+    
+    return rouge_scores
+
+def display_rouge_scores(rouge_scores):
+    """Render ROUGE-1/2/L metrics side by side."""
+    st.markdown("##### Quality Metrics (ROUGE Scores)")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("ROUGE-1", f"{rouge_scores['rouge1']:.2f}")
+    with col2:
+        st.metric("ROUGE-2", f"{rouge_scores['rouge2']:.2f}")
+    with col3:
+        st.metric("ROUGE-L", f"{rouge_scores['rougeL']:.2f}")
 
 def run_summarization_tool():
     st.title("📚 Research Paper Summarizer")
@@ -374,11 +652,7 @@ def run_summarization_tool():
         st.session_state.paper_summaries = {}
     
     # Set up the paper sources
-    sources = {
-        "arXiv": ArxivSource(),
-        "Semantic Scholar": SemanticScholarSource(),
-        "Crossref": CrossrefSource()
-    }
+    sources = get_paper_sources()
     
     # Search interface
     st.subheader("Search for papers")
@@ -390,6 +664,15 @@ def run_summarization_tool():
     with col2:
         source_name = st.selectbox("Source", list(sources.keys()))
     
+    mode_label = st.radio(
+        "Summary mode",
+        list(SUMMARY_MODES.keys()),
+        horizontal=True,
+        help="Abstractive rewrites each section with BART; Full paper adds a map-reduce pass and a whole-paper "
+             "overview for long papers; Extractive picks key sentences instantly without a model"
+    )
+    summary_mode = SUMMARY_MODES[mode_label]
+    
     # Option to upload a PDF directly
     st.subheader("Or upload a PDF directly")
     uploaded_file = st.file_uploader("Upload a research paper", type="pdf")
@@ -401,6 +684,8 @@ def run_summarization_tool():
                 if results:
                     st.session_state.search_results = results
                     st.session_state.current_source = source_name
+                    # Warm up downloads of the top results while the user reads them
+                    sources[source_name].prefetch(results)
                 else:
                     st.warning(f"No results found for '{search_query}' in {source_name}.")
                     st.session_state.search_results = []
@@ -413,8 +698,10 @@ def run_summarization_tool():
         with st.spinner("Processing your uploaded PDF..."):
             try:
                 pdf_content = uploaded_file.getvalue()
-                summarizer = PaperSummarizer()
-                summaries = summarizer.summarize_paper(pdf_content)
+                summarizer = load_summarizer()
+                preview = show_extractive_preview(summarizer, pdf_content, summary_mode)
+                summaries = summarizer.summarize_paper(pdf_content, mode=summary_mode)
+                preview.empty()
                 
                 paper_id = f"uploaded_{datetime.now().strftime('%Y%m%d%H%M%S')}"
                 paper = {
@@ -438,6 +725,23 @@ def run_summarization_tool():
     # Display search results
     if hasattr(st.session_state, 'search_results') and st.session_state.search_results:
         st.subheader("Search Results")
+        
+        # Batch summarization runs in the background job queue
+        results = st.session_state.search_results
+        selected = st.multiselect(
+            "Papers to summarize in the background (leave empty for all)",
+            options=list(range(len(results))),
+            format_func=lambda i: f"{i+1}. {results[i]['title']}"
+        )
+        if st.button("Summarize in Background"):
+            papers_to_queue = [results[i] for i in selected] if selected else results
+            keys = get_job_queue().enqueue_many(papers_to_queue, st.session_state.current_source,
+                                                summary_mode)
+            if "batch_jobs" not in st.session_state:
+                st.session_state.batch_jobs = []
+            st.session_state.batch_jobs.extend(k for k in keys if k not in st.session_state.batch_jobs)
+            st.success(f"Queued {len(keys)} paper(s) for background summarization.")
+        
         for i, paper in enumerate(st.session_state.search_results):
             with st.expander(f"{i+1}. {paper['title']}"):
                 st.write(f"**Authors:** {', '.join(paper['authors'])}")
@@ -451,13 +755,15 @@ def run_summarization_tool():
                     source = sources[st.session_state.current_source]
                     paper_id = paper['id']
                     
-                    with st.spinner("Downloading and processing paper..."):
-                        pdf_content = source.get_paper(paper_id)
-                        
+                    # The downloaded PDF is held until summarizing is done
+                    with st.spinner("Downloading and processing paper..."), \
+                            source.open_paper(paper_id, paper.get('pdf_url')) as pdf_content:
                         if pdf_content:
                             try:
-                                summarizer = PaperSummarizer()
-                                summaries = summarizer.summarize_paper(pdf_content)
+                                summarizer = load_summarizer()
+                                preview = show_extractive_preview(summarizer, pdf_content, summary_mode)
+                                summaries = summarizer.summarize_paper(pdf_content, mode=summary_mode)
+                                preview.empty()
                                 st.session_state.paper_summaries[paper_id] = {
                                     'paper': paper,
                                     'summaries': summaries
@@ -468,6 +774,39 @@ def run_summarization_tool():
                         else:
                             st.error("Could not download the paper. It might be behind a paywall or not available in PDF format.")
     
+    # Background job progress
+    if st.session_state.get("batch_jobs"):
+        st.subheader("Background Summaries")
+        job_queue = get_job_queue()
+        jobs = job_queue.status(st.session_state.batch_jobs)
+        active = False
+        for key in st.session_state.batch_jobs:
+            job = jobs.get(key)
+            if not job:
+                continue
+            paper = job['paper']
+            if job['status'] == DONE:
+                if paper['id'] not in st.session_state.paper_summaries:
+                    st.session_state.paper_summaries[paper['id']] = {
+                        'paper': paper,
+                        'summaries': job_queue.result(key)
+                    }
+                st.write(f"✅ {paper['title']}")
+                for message in job['warnings']:
+                    st.caption(f"⚠️ {message}")
+            elif job['status'] == RUNNING:
+                active = True
+                fraction = job['done'] / job['total'] if job['total'] else 0.0
+                st.progress(fraction, text=f"{paper['title']} ({job['done']}/{job['total']} sections)")
+            elif job['status'] == QUEUED:
+                active = True
+                st.write(f"⏳ {paper['title']} (queued)")
+            else:
+                st.write(f"❌ {paper['title']}: {job['error']}")
+        
+        if active:
+            st.button("Refresh Progress")
+    
     # Display summaries
     if st.session_state.paper_summaries:
         st.subheader("Paper Summaries")
@@ -476,77 +815,88 @@ def run_summarization_tool():
             summaries = data['summaries']
             
             with st.expander(f"Summary of: {paper['title']}"):
-                for item in summaries:
+                for idx, item in enumerate(summaries):
                     section_title = item[0]
                     summary = item[1]
-                    rouge_scores = item[2] if len(item) > 2 else None
                     
                     st.markdown(f"### {section_title}")
                     st.write(summary)
                     
-                    # Display ROUGE scores if available - NO NESTED EXPANDERS
-                    if rouge_scores:
-                        st.markdown("##### Quality Metrics (ROUGE Scores)")
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("ROUGE-1", f"{rouge_scores['rouge1']:.2f}")
-                        with col2:
-                            st.metric("ROUGE-2", f"{rouge_scores['rouge2']:.2f}")
-                        with col3:
-                            st.metric("ROUGE-L", f"{rouge_scores['rougeL']:.2f}")
-                        
-                        st.markdown("""
-                        **ROUGE Score Interpretation:**
-                        - **ROUGE-1**: Overlap of unigrams (single words)
-                        - **ROUGE-2**: Overlap of bigrams (word pairs)
-                        - **ROUGE-L**: Longest common subsequence
-                        
-                        Higher scores (closer to 1.0) indicate better summary quality compared to the source text.
-                        """)
+                    # ROUGE scores are only computed once the user asks for them - NO NESTED EXPANDERS
+                    if len(item) > 3 and st.checkbox("Show Quality Metrics (ROUGE Scores)", key=f"rouge_{paper_id}_{idx}"):
+                        rouge_scores = get_section_rouge_scores(summaries, idx)
+                        if rouge_scores:
+                            display_rouge_scores(rouge_scores)
+                            
+                            st.markdown("""
+                            **ROUGE Score Interpretation:**
+                            - **ROUGE-1**: Overlap of unigrams (single words)
+                            - **ROUGE-2**: Overlap of bigrams (word pairs)
+                            - **ROUGE-L**: Longest common subsequence
+                            
+                            Higher scores (closer to 1.0) indicate better summary quality compared to the source text.
+                            """)
                 
                 if st.button("Save to My Library", key=f"save_{paper_id}"):
-                    if "my_library" not in st.session_state:
-                        st.session_state.my_library = []
-                    
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    st.session_state.my_library.append({
-                        'paper': paper,
-                        'summaries': summaries,
-                        'added_on': timestamp
-                    })
+                    get_library().add(library_owner(), paper, summaries)
                     st.success("Added to your library!")
     
-    # My Library
-    if "my_library" in st.session_state and st.session_state.my_library:
-        st.subheader("My Library")
-        for i, item in enumerate(st.session_state.my_library):
+    # My Library - papers are stored on disk and listed a page at a time
+    library = get_library()
+    owner = library_owner()
+    total_saved = library.count(owner)
+    st.subheader("My Library")
+    show_library_key(library, owner)
+    if total_saved:
+        total_pages = (total_saved + LIBRARY_PAGE_SIZE - 1) // LIBRARY_PAGE_SIZE
+        page = st.session_state.get("library_page", 0)
+        page = min(page, total_pages - 1)
+        
+        for item in library.list_papers(owner, offset=page * LIBRARY_PAGE_SIZE, limit=LIBRARY_PAGE_SIZE):
+            library_id = item['id']
             paper = item['paper']
             with st.expander(f"{paper['title']}"):
                 st.write(f"**Authors:** {', '.join(paper['authors'])}")
                 st.write(f"**Added on:** {item['added_on']}")
                 st.write(f"**Source:** {paper['source']}")
                 
-                if st.button("View Summary", key=f"view_{i}"):
+                if st.session_state.get("library_view") == library_id:
+                    if st.button("Hide Summary", key=f"hide_{library_id}"):
+                        st.session_state.library_view = None
+                        st.rerun()
+                    
+                    # Summaries are only read from the library while a paper is open
                     st.markdown("### Section Summaries")
-                    for section_data in item['summaries']:
-                        section_title = section_data[0]
-                        summary = section_data[1]
-                        rouge_scores = section_data[2] if len(section_data) > 2 else None
-                        
+                    for idx, (section_title, summary, rouge_scores) in enumerate(library.get_summaries(owner, library_id)):
                         st.markdown(f"#### {section_title}")
                         st.write(summary)
                         
-                        # Display ROUGE scores if available - NO NESTED EXPANDERS
+                        # Section text is read from disk only when scores are first computed - NO NESTED EXPANDERS
+                        if rouge_scores is None and st.checkbox("Show Quality Metrics (ROUGE Scores)",
+                                                                key=f"lib_rouge_{library_id}_{idx}"):
+                            section_text = library.get_section_text(owner, library_id, idx)
+                            if section_text:
+                                rouge_scores = calculate_rouge_scores(summary, section_text)
+                                library.save_rouge_scores(owner, library_id, idx, rouge_scores)
                         if rouge_scores:
-                            st.markdown("##### Quality Metrics (ROUGE Scores)")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("ROUGE-1", f"{rouge_scores['rouge1']:.2f}")
-                            with col2:
-                                st.metric("ROUGE-2", f"{rouge_scores['rouge2']:.2f}")
-                            with col3:
-                                st.metric("ROUGE-L", f"{rouge_scores['rougeL']:.2f}")
+                            display_rouge_scores(rouge_scores)
+                elif st.button("View Summary", key=f"view_{library_id}"):
+                    st.session_state.library_view = library_id
+                    st.rerun()
                 
-                if st.button("Remove from Library", key=f"remove_{i}"):
-                    st.session_state.my_library.pop(i)
-                    st.rerun()
\ No newline at end of file
+                if st.button("Remove from Library", key=f"remove_{library_id}"):
+                    library.remove(owner, library_id)
+                    st.rerun()
+        
+        if total_pages > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("Previous", disabled=page == 0):
+                    st.session_state.library_page = page - 1
+                    st.rerun()
+            with col2:
+                st.write(f"Page {page + 1} of {total_pages} ({total_saved} papers)")
+            with col3:
+                if st.button("Next", disabled=page >= total_pages - 1):
+                    st.session_state.library_page = page + 1
+                    st.rerun()
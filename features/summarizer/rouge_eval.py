@@ -0,0 +1,121 @@
+"""
+Fast ROUGE evaluation for the Paper Summarizer.
+
+Produces the same ROUGE-1/2/L F-measures as ``rouge_score.RougeScorer`` with
+``use_stemmer=True``, but counts n-gram overlap with NumPy and computes the
+ROUGE-L longest common subsequence with a bit-parallel algorithm, so scoring a
+summary against a long section stays cheap.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+from nltk.stem import porter
+
+# Same normalisation rules as rouge_score.tokenize
+NON_ALPHANUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Upper bound on reference tokens considered; keeps worst-case cost predictable
+MAX_REFERENCE_TOKENS = 20000
+
+_stemmer = porter.PorterStemmer()
+
+
+@lru_cache(maxsize=50000)
+def _stem(token):
+    """Stem a single token, caching the result (vocabularies are small)."""
+    return _stemmer.stem(token) if len(token) > 3 else token
+
+
+def tokenize(text, max_tokens=None):
+    """Lowercase, strip punctuation and stem text the way rouge_score does."""
+    tokens = NON_ALPHANUM_RE.sub(" ", text.lower()).split()
+    if max_tokens is not None:
+        tokens = tokens[:max_tokens]
+    return [_stem(token) for token in tokens]
+
+
+def _fmeasure(overlap, candidate_total, reference_total):
+    """Harmonic mean of precision and recall, 0 when either is empty."""
+    if not overlap or not candidate_total or not reference_total:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def _ngram_ids(token_ids, n, vocab_size):
+    """Encode every n-gram of an id sequence as a single integer."""
+    if len(token_ids) < n:
+        return np.empty(0, dtype=np.int64)
+    ids = token_ids[:len(token_ids) - n + 1].astype(np.int64)
+    for offset in range(1, n):
+        ids = ids * vocab_size + token_ids[offset:len(token_ids) - n + 1 + offset]
+    return ids
+
+
+def ngram_overlap(candidate_ids, reference_ids, n, vocab_size):
+    """Return (clipped overlap, candidate n-gram count, reference n-gram count)."""
+    cand = _ngram_ids(candidate_ids, n, vocab_size)
+    ref = _ngram_ids(reference_ids, n, vocab_size)
+    if not len(cand) or not len(ref):
+        return 0, len(cand), len(ref)
+
+    cand_keys, cand_counts = np.unique(cand, return_counts=True)
+    ref_keys, ref_counts = np.unique(ref, return_counts=True)
+    _, cand_idx, ref_idx = np.intersect1d(cand_keys, ref_keys, assume_unique=True, return_indices=True)
+    overlap = int(np.minimum(cand_counts[cand_idx], ref_counts[ref_idx]).sum())
+    return overlap, len(cand), len(ref)
+
+
+def lcs_length(a, b):
+    """Length of the longest common subsequence of two token sequences.
+
+    Bit-parallel (Allison-Dix / Hyyro) formulation: ``a`` is packed into
+    a Python integer bit-vector, so the work is O(len(b) * len(a) / wordsize)
+    instead of the O(len(a) * len(b)) dynamic-programming table.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return 0
+
+    masks = {}
+    for i, token in enumerate(a):
+        masks[token] = masks.get(token, 0) | (1 << i)
+
+    full = (1 << len(a)) - 1
+    v = full
+    for token in b:
+        match = masks.get(token)
+        if match is None:
+            continue
+        u = v & match
+        v = ((v + u) | (v - u)) & full
+
+    return len(a) - bin(v).count("1")
+
+
+def calculate_rouge_scores(summary, reference, max_reference_tokens=MAX_REFERENCE_TOKENS):
+    """Calculate ROUGE-1, ROUGE-2 and ROUGE-L F-measures of a summary against its source."""
+    candidate_tokens = tokenize(summary)
+    reference_tokens = tokenize(reference, max_tokens=max_reference_tokens)
+
+    if not candidate_tokens or not reference_tokens:
+        return {'rouge1': 0.0, 'rouge2': 0.0, 'rougeL': 0.0}
+
+    # Map tokens to dense integer ids shared by both texts
+    vocab, inverse = np.unique(np.array(candidate_tokens + reference_tokens), return_inverse=True)
+    inverse = inverse.astype(np.int64)
+    candidate_ids = inverse[:len(candidate_tokens)]
+    reference_ids = inverse[len(candidate_tokens):]
+    vocab_size = len(vocab)
+
+    scores = {}
+    for n, name in ((1, 'rouge1'), (2, 'rouge2')):
+        scores[name] = _fmeasure(*ngram_overlap(candidate_ids, reference_ids, n, vocab_size))
+
+    lcs = lcs_length(candidate_ids.tolist(), reference_ids.tolist())
+    scores['rougeL'] = _fmeasure(lcs, len(candidate_tokens), len(reference_tokens))
+    return scores
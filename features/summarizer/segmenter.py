@@ -0,0 +1,113 @@
+"""
+Single-pass section segmentation for the Paper Summarizer.
+
+All header styles (numbered, ALL CAPS and common section names) are matched by
+one precompiled, line-anchored alternation in a single scan of the text.
+Sections are tracked as offsets into the original string and only sliced once,
+when the caller asks for the section text.
+
+Run ``python -m features.summarizer.segmenter`` for a micro-benchmark on large
+synthetic papers.
+"""
+
+import re
+import time
+
+COMMON_SECTION_NAMES = (
+    'Abstract', 'Introduction', 'Related Work', 'Background', 'Methodology',
+    'Experiments', 'Results', 'Discussion', 'Conclusion', 'References'
+)
+
+# One alternation for every header style; each header must occupy a whole line
+HEADER_RE = re.compile(
+    r'^[ \t]*(?P<header>'
+    r'\d+\.[ \t]*\w[\w \t]*?'                  # Numbered sections like "1. Introduction"
+    r'|[A-Z][A-Z \t]+'                         # ALL CAPS sections
+    r'|' + '|'.join(COMMON_SECTION_NAMES) +    # Common section names
+    r')[ \t]*\r?$',
+    re.MULTILINE
+)
+
+# Headers longer than this are most likely a sentence, not a heading
+MAX_HEADER_LENGTH = 100
+
+
+def find_headers(text):
+    """Return (header, header_start, content_start) for each distinct header line."""
+    headers = []
+    for match in HEADER_RE.finditer(text):
+        header = match.group('header').strip()
+        if 2 <= len(header) <= MAX_HEADER_LENGTH:
+            headers.append((header, match.start(), match.end()))
+    return headers
+
+
+def _trim(text, start, end):
+    """Shrink [start, end) so it excludes surrounding whitespace, without copying."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def segment(text):
+    """Split text into sections as (header, content_start, content_end) offsets.
+
+    Headers immediately followed by another header have no content of their
+    own and are skipped, so stacked headings do not produce empty sections.
+    """
+    headers = find_headers(text)
+    bounds = []
+    for i, (header, _, content_start) in enumerate(headers):
+        next_start = headers[i + 1][1] if i + 1 < len(headers) else len(text)
+        start, end = _trim(text, content_start, next_start)
+        if start < end:
+            bounds.append((header, start, end))
+    return bounds
+
+
+def slice_sections(text, bounds):
+    """Materialise (header, content) pairs from segment offsets."""
+    return [(header, text[start:end]) for header, start, end in bounds]
+
+
+def _synthetic_paper(n_sections, paragraphs_per_section=8):
+    """Build a large synthetic paper mixing every header style."""
+    paragraph = ("We evaluate the proposed method on several benchmark datasets and "
+                 "report consistent improvements over strong baselines. ") * 6
+    styles = [
+        lambda i: f"{i}. Section Number {i}",
+        lambda i: "EXPERIMENTAL SETUP AND ANALYSIS",
+        lambda i: COMMON_SECTION_NAMES[i % len(COMMON_SECTION_NAMES)],
+    ]
+    parts = []
+    for i in range(1, n_sections + 1):
+        parts.append(styles[i % len(styles)](i))
+        parts.extend(paragraph for _ in range(paragraphs_per_section))
+    return "\n".join(parts) + "\n"
+
+
+def benchmark(section_counts=(50, 500, 5000), repeats=5):
+    """Time segmentation on synthetic papers of increasing size."""
+    results = []
+    for n_sections in section_counts:
+        text = _synthetic_paper(n_sections)
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            sections = slice_sections(text, segment(text))
+            best = min(best, time.perf_counter() - start)
+        results.append({
+            'sections': len(sections),
+            'chars': len(text),
+            'seconds': best,
+            'mb_per_second': len(text) / best / 1e6 if best else float('inf')
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['chars']:>12,} chars  {row['sections']:>6} sections  "
+              f"{row['seconds'] * 1000:8.2f} ms  {row['mb_per_second']:7.1f} MB/s")
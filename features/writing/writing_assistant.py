@@ -1,17 +1,35 @@
 import streamlit as st
 import google.generativeai as genai
 import json
+from utils.llm_cache import LLM_CACHE, LLMResponseCache
+from utils.gemini_config import configure_gemini
 
 # Configure Gemini API and list available models
 def configure_genai_and_list_models(api_key: str):
-    genai.configure(api_key=api_key)
     try:
-        available_models = genai.list_models()
-        model_names = [model.name for model in available_models if "generateContent" in model.supported_generation_methods]
-        return model_names
+        # Cached per key, so reruns do not list models again
+        return configure_gemini(api_key)
     except Exception as e:
         raise Exception(f"Error listing models: {str(e)}")
 
+def session_cache() -> LLMResponseCache:
+    """In-memory response cache of this session, for prompts that contain the user's own text."""
+    if 'llm_session_cache' not in st.session_state:
+        st.session_state.llm_session_cache = LLMResponseCache(db_path=None)
+    return st.session_state.llm_session_cache
+
+def generate_text(model, prompt: str, private: bool = False) -> str:
+    """Generate a response with Gemini, reusing cached responses to identical prompts.
+    
+    Prompts built from the user's drafts or topic ideas are private: they are
+    cached for this session only and never written to the shared on-disk cache.
+    """
+    cache = session_cache() if private else LLM_CACHE
+    return cache.get_or_generate(
+        "gemini", model.model_name, prompt,
+        lambda: model.generate_content(prompt).text
+    )
+
 # Initialize session state
 def init_session_state():
     if 'current_section' not in st.session_state:
@@ -101,8 +119,8 @@ def generate_section_guidance(model, section: str, topic: str) -> str:
     Base your response on standard academic writing practices and these guidelines:
     {RESEARCH_GUIDELINES.get(section.lower(), '')}
     """
-    response = model.generate_content(prompt)
-    return response.text
+    # The prompt carries the user's topic, so it stays out of the shared cache
+    return generate_text(model, prompt, private=True)
 
 def run_writing():
     st.subheader("✍️ Guide Research Writing")
@@ -173,8 +191,7 @@ def run_writing():
                     4. Key areas to focus on
                     5. Possible challenges
                     """
-                    response = model.generate_content(prompt)
-                    st.markdown(response.text)
+                    st.markdown(generate_text(model, prompt, private=True))
                 st.session_state.paper_content['topic'] = topic
             except Exception as e:
                 st.error(f"Error generating content: {str(e)}")
@@ -221,8 +238,7 @@ def run_writing():
                     4. Missing elements
                     5. Strengths of the current version
                     """
-                    response = model.generate_content(prompt)
-                    st.markdown(response.text)
+                    st.markdown(generate_text(model, prompt, private=True))
                 st.session_state.paper_content[section_key] = section_content
             except Exception as e:
                 st.error(f"Error generating feedback: {str(e)}")
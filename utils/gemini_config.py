@@ -0,0 +1,71 @@
+"""
+Cached Gemini API key validation and model listing.
+
+Validating a key means listing the models it can use, which is a network
+round trip. Results are cached per key fingerprint (a hash, so raw keys are
+not kept as cache keys) for a TTL. Streamlit reruns then configure Gemini
+without calling the API. Failed validations are cached briefly as well, so
+an invalid key is not retried on every keystroke.
+"""
+
+import hashlib
+import threading
+import time
+
+import google.generativeai as genai
+
+try:
+    from config import CACHE_SETTINGS
+except ImportError:
+    CACHE_SETTINGS = {"ttl": 3600, "max_entries": 100}
+
+CREDENTIAL_TTL = CACHE_SETTINGS["ttl"]
+# Invalid keys are re-checked sooner, in case the problem was transient
+FAILED_CREDENTIAL_TTL = 60
+
+_lock = threading.Lock()
+_credentials = {}
+
+
+def key_fingerprint(api_key):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def list_generation_models(api_key):
+    """Names of the models this key can use with generateContent, cached per key.
+
+    Raises the original error when the key cannot list models.
+    """
+    fingerprint = key_fingerprint(api_key)
+    now = time.monotonic()
+    with _lock:
+        entry = _credentials.get(fingerprint)
+    if entry and entry[0] > now:
+        if isinstance(entry[1], Exception):
+            raise entry[1]
+        return list(entry[1])
+
+    genai.configure(api_key=api_key)
+    try:
+        model_names = [
+            model.name for model in genai.list_models()
+            if "generateContent" in model.supported_generation_methods
+        ]
+    except Exception as e:
+        with _lock:
+            _credentials[fingerprint] = (now + FAILED_CREDENTIAL_TTL, e)
+        raise
+
+    with _lock:
+        _credentials[fingerprint] = (now + CREDENTIAL_TTL, tuple(model_names))
+        # Drop expired entries so the cache cannot grow without bound
+        for stale in [key for key, (expires, _) in _credentials.items() if expires <= now]:
+            del _credentials[stale]
+    return model_names
+
+
+def configure_gemini(api_key):
+    """Configure the Gemini client for api_key and return its usable model names."""
+    # Local only; the network check happens in list_generation_models, at most once per TTL
+    genai.configure(api_key=api_key)
+    return list_generation_models(api_key)
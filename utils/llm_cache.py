@@ -0,0 +1,136 @@
+"""
+Prompt-hash response cache for LLM calls (Ollama and Gemini).
+
+Responses are keyed by backend, model, a SHA-256 hash of the prompt and the
+sampling parameters, so an identical request, such as section guidance on
+every Streamlit rerun, is answered without calling the model again. Entries
+expire after a TTL. An in-memory LRU bounds process memory, and an optional
+SQLite store keeps responses across restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from config import CACHE_SETTINGS
+except ImportError:
+    CACHE_SETTINGS = {"ttl": 3600, "max_entries": 100}
+
+LLM_CACHE_DB_PATH = os.path.join(".cache", "llm_responses.db")
+# Responses kept on disk; the in-memory LRU holds CACHE_SETTINGS["max_entries"]
+MAX_DISK_ENTRIES = 2000
+
+
+def make_key(backend, model, prompt, system_prompt="", **params):
+    """Cache key for one request: backend, model, prompt hash and sampling params."""
+    prompt_hash = hashlib.sha256(f"{system_prompt}\x00{prompt}".encode("utf-8")).hexdigest()
+    return json.dumps([backend, model, prompt_hash, params], sort_keys=True, default=str)
+
+
+class LLMResponseCache:
+    """Thread-safe TTL + LRU cache of LLM responses with optional SQLite persistence."""
+
+    def __init__(self, ttl=CACHE_SETTINGS["ttl"], max_entries=CACHE_SETTINGS["max_entries"],
+                 db_path=None, max_disk_entries=MAX_DISK_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            if os.path.dirname(db_path):
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+            if self.db_path:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                if row and not self._expired(row[1]):
+                    self._remember(key, row[1], row[0])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, response)
+            if self.db_path:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                        (key, response, created_at)
+                    )
+                    # Drop expired rows and anything beyond the disk budget, oldest first
+                    if self.ttl is not None:
+                        conn.execute("DELETE FROM responses WHERE created_at < ?", (created_at - self.ttl,))
+                    conn.execute(
+                        "DELETE FROM responses WHERE key NOT IN "
+                        "(SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)",
+                        (self.max_disk_entries,)
+                    )
+
+    def _remember(self, key, created_at, response):
+        self._entries[key] = (created_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_generate(self, backend, model, prompt, generate_fn, system_prompt="", **params):
+        """Return a cached response or call generate_fn() and cache its (non-empty) result."""
+        key = make_key(backend, model, prompt, system_prompt, **params)
+        response = self.get(key)
+        if response is None:
+            response = generate_fn()
+            if response:
+                self.put(key, response)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.db_path:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM responses")
+
+
+# Shared by all features; set LLM_CACHE_PERSIST=0 to keep responses in memory only
+LLM_CACHE = LLMResponseCache(
+    db_path=LLM_CACHE_DB_PATH if os.environ.get("LLM_CACHE_PERSIST", "1") != "0" else None
+)